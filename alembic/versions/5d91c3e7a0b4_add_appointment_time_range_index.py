@@ -0,0 +1,28 @@
+"""add appointment time range index
+
+Revision ID: 5d91c3e7a0b4
+Revises: 7b3f0e9c5a21
+Create Date: 2026-10-15 23:12:38.840271
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d91c3e7a0b4'
+down_revision: Union[str, None] = '7b3f0e9c5a21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_appointments_time_range', 'appointments', [sa.text('tstzrange(date, end_time)')], unique=False, postgresql_using='gist')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_appointments_time_range', table_name='appointments', postgresql_using='gist')
@@ -0,0 +1,55 @@
+"""use timestamptz columns
+
+Revision ID: 7b3f0e9c5a21
+Revises: c4e8a1d2b9f3
+Create Date: 2026-10-15 22:44:09.512730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3f0e9c5a21'
+down_revision: Union[str, None] = 'c4e8a1d2b9f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Existing values were stored as naive UTC.
+COLUMNS = [
+    ('appointments', 'date', False),
+    ('appointments', 'end_time', False),
+    ('appointments', 'created_at', True),
+    ('appointments', 'updated_at', True),
+    ('cancelations', 'created_at', True),
+    ('clients', 'created_at', True),
+    ('clients', 'updated_at', True),
+    ('users', 'created_at', True),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, column, has_default in COLUMNS:
+        op.alter_column(
+            table, column,
+            existing_type=sa.DateTime(),
+            type_=sa.DateTime(timezone=True),
+            postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+            server_default=sa.text('now()') if has_default else None,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column, has_default in COLUMNS:
+        op.alter_column(
+            table, column,
+            existing_type=sa.DateTime(timezone=True),
+            type_=sa.DateTime(),
+            postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+            server_default=None,
+        )
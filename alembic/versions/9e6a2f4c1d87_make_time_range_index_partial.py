@@ -0,0 +1,30 @@
+"""make time range index partial
+
+Revision ID: 9e6a2f4c1d87
+Revises: 5d91c3e7a0b4
+Create Date: 2026-10-15 23:41:07.215934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e6a2f4c1d87'
+down_revision: Union[str, None] = '5d91c3e7a0b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index('ix_appointments_time_range', table_name='appointments', postgresql_using='gist')
+    op.create_index('ix_appointments_time_range', 'appointments', [sa.text('tstzrange(date, end_time)')], unique=False, postgresql_using='gist', postgresql_where=sa.text("status <> 'cancelled'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_appointments_time_range', table_name='appointments', postgresql_using='gist', postgresql_where=sa.text("status <> 'cancelled'"))
+    op.create_index('ix_appointments_time_range', 'appointments', [sa.text('tstzrange(date, end_time)')], unique=False, postgresql_using='gist')
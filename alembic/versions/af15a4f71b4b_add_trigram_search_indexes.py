@@ -0,0 +1,39 @@
+"""add trigram search indexes
+
+Revision ID: af15a4f71b4b
+Revises: 2e65d50256f8
+Create Date: 2026-10-15 22:16:05.731442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'af15a4f71b4b'
+down_revision: Union[str, None] = '2e65d50256f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_appointments_notes_trgm', 'appointments', ['notes'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'notes': 'gin_trgm_ops'})
+    op.create_index('ix_clients_name_trgm', 'clients', ['name'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_clients_email_trgm', 'clients', ['email'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'})
+    op.create_index('ix_services_name_trgm', 'services', ['name'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_services_name_trgm', table_name='services')
+    op.drop_index('ix_clients_email_trgm', table_name='clients')
+    op.drop_index('ix_clients_name_trgm', table_name='clients')
+    op.drop_index('ix_appointments_notes_trgm', table_name='appointments')
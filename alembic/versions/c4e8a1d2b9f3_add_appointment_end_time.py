@@ -0,0 +1,45 @@
+"""add appointment end_time and total_duration
+
+Revision ID: c4e8a1d2b9f3
+Revises: af15a4f71b4b
+Create Date: 2026-10-15 22:31:47.206518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a1d2b9f3'
+down_revision: Union[str, None] = 'af15a4f71b4b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('appointments', sa.Column('end_time', sa.DateTime(), nullable=True))
+    op.add_column('appointments', sa.Column('total_duration', sa.Integer(), server_default='0', nullable=False))
+    op.execute("""
+        UPDATE appointments AS a
+        SET total_duration = s.total_duration,
+            end_time = a.date + make_interval(mins => s.total_duration)
+        FROM (
+            SELECT ap.id, COALESCE(SUM(sv.duration), 0) AS total_duration
+            FROM appointments AS ap
+            LEFT JOIN appointment_services AS aps ON aps.appointment_id = ap.id
+            LEFT JOIN services AS sv ON sv.id = aps.service_id
+            GROUP BY ap.id
+        ) AS s
+        WHERE s.id = a.id
+    """)
+    op.create_index('ix_appointments_status_client_id_date', 'appointments', ['status', 'client_id', 'date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_appointments_status_client_id_date', table_name='appointments')
+    op.drop_column('appointments', 'total_duration')
+    op.drop_column('appointments', 'end_time')
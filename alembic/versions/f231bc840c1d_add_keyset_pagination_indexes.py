@@ -0,0 +1,30 @@
+"""add keyset pagination indexes
+
+Revision ID: f231bc840c1d
+Revises: df1cc8b27601
+Create Date: 2026-10-15 21:58:12.402913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f231bc840c1d'
+down_revision: Union[str, None] = 'df1cc8b27601'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_appointments_created_at_id', 'appointments', ['created_at', 'id'], unique=False)
+    op.create_index('ix_clients_created_at_id', 'clients', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_clients_created_at_id', table_name='clients')
+    op.drop_index('ix_appointments_created_at_id', table_name='appointments')
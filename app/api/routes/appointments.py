@@ -1,27 +1,25 @@
-from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-import app.schemas
 from app.database import get_db
-import app.schemas.appointments
-import app.schemas.common
-import app.schemas.users
+from app.utils import json_response, pagination_headers
+from app.schemas.appointments import AppointmentCreate, AppointmentRead, AppointmentUpdate, BlockedSlot, PaginatedAppointments
+from app.schemas.users import UserRead
 from app.services.appointments import create_appointment, get_appointments, get_my_appointments, update_appointment, delete_appointment, cancel_appointment, complete_appointment
 from app.dependencies import get_current_active_user, get_current_admin, get_current_staff_or_admin
 from sqlalchemy.future import select
 from app.schemas.cancelation import CancelationCreate, CancelationRead
 from app.models import Appointment
-from sqlalchemy.orm import selectinload
 
 router = APIRouter()
 
 
-@router.post('/', response_model=app.schemas.AppointmentRead)
+@router.post('/', response_model=AppointmentRead)
 async def create_appointment_endpoint(
-    appointment: app.schemas.AppointmentCreate,
+    appointment: AppointmentCreate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
-    current_user: app.schemas.UserRead = Depends(get_current_active_user)
+    current_user: UserRead = Depends(get_current_active_user)
 ):
     """
     Create a new appointment.
@@ -29,66 +27,72 @@ async def create_appointment_endpoint(
     - **Request body:** AppointmentCreate object with appointment details.
     - **Authentication:** Requires an authenticated user (client).
     - **Response:** AppointmentRead object with the created appointment information.
+    - **Side effects:** Sends a confirmation email to the client after the response.
     """
-    return await create_appointment(db, appointment)
+    return await create_appointment(db, appointment, background_tasks)
 
 
-@router.get('/', response_model=app.schemas.common.PaginationResponse[app.schemas.AppointmentRead])
+@router.get('/', response_model=PaginatedAppointments)
 async def get_appointments_endpoint(
-    skip: int = 0,
-    limit: int = 20,
+    skip: int = Query(0, ge=0, le=100_000),
+    limit: int = Query(20, ge=1, le=100),
     db: AsyncSession = Depends(get_db),
     search: Optional[str] = Query(
         None, description="Search for appointments by title or description"),
-    current_user: app.schemas.UserRead = Depends(get_current_admin)
+    cursor: Optional[str] = Query(
+        None, description="Cursor returned as next_cursor by the previous page"),
+    current_user: UserRead = Depends(get_current_admin)
 ):
     """
     Get a paginated list of all appointments. Allows searching by title or description.
 
     - **Query params:**
-        - skip: Number of items to skip (pagination, default: 0)
-        - limit: Maximum number of items to return (default: 20)
+        - skip: Number of items to skip (pagination, default: 0); above 1000 the response carries a Deprecation header, prefer cursor
+        - limit: Maximum number of items to return (default: 20, max: 100)
         - search: Text to search in title or description
+        - cursor: Keyset cursor from a previous page; when set, skip is ignored
     - **Authentication:** Requires admin user.
     - **Response:** PaginationResponse[AppointmentRead] with the list of appointments.
     """
-    return await get_appointments(db, skip=skip, limit=limit, search=search or "")
+    return json_response(
+        await get_appointments(db, skip=skip, limit=limit, search=search or "", cursor=cursor),
+        headers=pagination_headers(skip, cursor)
+    )
 
 
-@router.get('/my', response_model=app.schemas.common.PaginationResponse[app.schemas.AppointmentRead])
+@router.get('/my', response_model=PaginatedAppointments)
 async def get_my_appointments_endpoint(
-    skip: int = 0,
-    limit: int = 100,
+    skip: int = Query(0, ge=0, le=100_000),
+    limit: int = Query(100, ge=1, le=100),
     search: str = "",
+    cursor: Optional[str] = Query(
+        None, description="Cursor returned as next_cursor by the previous page"),
     db: AsyncSession = Depends(get_db),
-    current_user: app.schemas.UserRead = Depends(get_current_active_user)
+    current_user: UserRead = Depends(get_current_active_user)
 ):
     """
     Get a paginated list of the authenticated user's appointments.
 
     - **Query params:**
-        - skip: Number of items to skip (pagination, default: 0)
-        - limit: Maximum number of items to return (default: 100)
+        - skip: Number of items to skip (pagination, default: 0); above 1000 the response carries a Deprecation header, prefer cursor
+        - limit: Maximum number of items to return (default and max: 100)
         - search: Text to search in the user's appointments
+        - cursor: Keyset cursor from a previous page; when set, skip is ignored
     - **Authentication:** Requires an authenticated user (client).
     - **Response:** PaginationResponse[AppointmentRead] with the user's appointments.
     """
-    result = await db.execute(
-        select(app.models.Client).where(
-            app.models.Client.user_id == current_user.id)
+    return json_response(
+        await get_my_appointments(db, user_id=current_user.id, skip=skip, limit=limit, search=search or "", cursor=cursor),
+        headers=pagination_headers(skip, cursor)
     )
-    client = result.scalar_one_or_none()
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    return await get_my_appointments(db, client_id=client.id, skip=skip, limit=limit, search=search or "")
 
 
-@router.patch('/{appointment_id}', response_model=app.schemas.appointments.AppointmentRead)
+@router.patch('/{appointment_id}', response_model=AppointmentRead)
 async def patch_appointment_endpoint(
     appointment_id: int,
-    appointment_in: app.schemas.appointments.AppointmentUpdate,
+    appointment_in: AppointmentUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: app.schemas.UserRead = Depends(get_current_active_user)
+    current_user: UserRead = Depends(get_current_active_user)
 ):
     """
     Partially update an existing appointment.
@@ -105,7 +109,7 @@ async def patch_appointment_endpoint(
 async def delete_appointment_endpoint(
     appointment_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: app.schemas.users.UserRead = Depends(get_current_active_user)
+    current_user: UserRead = Depends(get_current_active_user)
 ):
     """
     Delete an existing appointment.
@@ -122,7 +126,7 @@ async def cancel_my_appointment_endpoint(
     appointment_id: int,
     body: CancelationCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: app.schemas.users.UserRead = Depends(get_current_active_user)
+    current_user: UserRead = Depends(get_current_active_user)
 ):
     """
     Cancel an existing appointment.
@@ -139,11 +143,11 @@ async def cancel_my_appointment_endpoint(
     )
 
 
-@router.post('/{appointment_id}/complete', response_model=app.schemas.appointments.AppointmentRead)
+@router.post('/{appointment_id}/complete', response_model=AppointmentRead)
 async def complete_appointment_endpoint(
     appointment_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: app.schemas.users.UserRead = Depends(
+    current_user: UserRead = Depends(
         get_current_staff_or_admin)
 ):
     """
@@ -158,24 +162,13 @@ async def complete_appointment_endpoint(
     return await complete_appointment(db, appointment_id)
 
 
-@router.get('/blocked', response_model=List[app.schemas.appointments.BlockedSlot])
-async def get_blocked_slots(db: AsyncSession = Depends(get_db), user: app.schemas.users.UserRead = Depends(get_current_active_user)):
+@router.get('/blocked', response_model=List[BlockedSlot])
+async def get_blocked_slots(db: AsyncSession = Depends(get_db), user: UserRead = Depends(get_current_active_user)):
     result = await db.execute(
-        select(Appointment)
-        .options(selectinload(Appointment.services))
+        select(Appointment.date, Appointment.end_time)
         .where(Appointment.status.in_(['pending', 'confirmed']))
     )
-    appointments = result.scalars().all()
-    blocked_slots = []
-    for appt in appointments:
-        duration = sum(s.duration for s in appt.services)
-        start = appt.date
-
-        if isinstance(start, str):
-            start = datetime.fromisoformat(start)
-        end = start + timedelta(minutes=duration)
-        blocked_slots.append(app.schemas.appointments.BlockedSlot(
-            start=start.isoformat(),
-            end=end.isoformat()
-        ))
-    return blocked_slots
+    return [
+        BlockedSlot(start=row.date, end=row.end_time)
+        for row in result
+    ]
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordRequestForm
 from app.database import get_db
@@ -14,7 +14,7 @@ router = APIRouter()
 
 
 @router.post("/login", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+async def login(background_tasks: BackgroundTasks, form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
     """
     Authenticate a user and return an access token.
 
@@ -26,7 +26,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSessi
     - **Raises:**
         - 401 Unauthorized if credentials are invalid
     """
-    user = await authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password, background_tasks)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -52,20 +52,22 @@ async def register(
     - **Request body:** RegisterRequest object with user and client details
     - **Authentication:** No authentication required
     - **Response:** UserRead object with the created user's information
-    - **Side effects:** Also creates a client profile associated with the user
+    - **Side effects:** Also creates a client profile associated with the user.
+      Both rows are committed in a single transaction.
     """
     user = await create_user(db, UserCreate(
         email=req.email,
         full_name=req.full_name,
         password=req.password,
         role=req.role
-    ))
-    client = await create_client(db, ClientCreate(
+    ), commit=False)
+    await create_client(db, ClientCreate(
         name=req.name,
         email=req.email,
         phone=req.phone,
         address=req.address
-    ), user_id=user.id)
+    ), user_id=user.id, commit=False)
+    await db.commit()
     return user
 
 
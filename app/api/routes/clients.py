@@ -1,17 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-import app.schemas
+from typing import Optional
 from app.database import get_db
-import app.schemas.clients
-import app.schemas.common
+from app.utils import json_response, pagination_headers
+from app.schemas.clients import ClientCreate, ClientRead, PaginatedClients
+from app.schemas.users import UserRead
 from app.services.clients import create_client, get_clients
 from app.dependencies import get_current_admin
 
 router = APIRouter()
 
 
-@router.post("/", response_model=app.schemas.clients.ClientRead)
-async def create_client_endpoint(client: app.schemas.clients.ClientCreate, db: AsyncSession = Depends(get_db)):
+@router.post("/", response_model=ClientRead)
+async def create_client_endpoint(client: ClientCreate, db: AsyncSession = Depends(get_db)):
     """
     Create a new client.
 
@@ -22,22 +23,28 @@ async def create_client_endpoint(client: app.schemas.clients.ClientCreate, db: A
     return await create_client(db, client)
 
 
-@router.get("/", response_model=app.schemas.common.PaginationResponse[app.schemas.clients.ClientRead])
+@router.get("/", response_model=PaginatedClients)
 async def list_clients_endpoints(
-    skip: int = 0,
-    limit: int = 20,
+    skip: int = Query(0, ge=0, le=100_000),
+    limit: int = Query(20, ge=1, le=100),
     db: AsyncSession = Depends(get_db),
     search: str = "",
-    current_user: app.schemas.UserRead = Depends(get_current_admin)
+    cursor: Optional[str] = Query(
+        None, description="Cursor returned as next_cursor by the previous page"),
+    current_user: UserRead = Depends(get_current_admin)
 ):
     """
     Get a paginated list of all clients. Allows searching by client fields.
 
     - **Query params:**
-        - skip: Number of items to skip (pagination, default: 0)
-        - limit: Maximum number of items to return (default: 20)
+        - skip: Number of items to skip (pagination, default: 0); above 1000 the response carries a Deprecation header, prefer cursor
+        - limit: Maximum number of items to return (default: 20, max: 100)
         - search: Text to search in client fields
+        - cursor: Keyset cursor from a previous page; when set, skip is ignored
     - **Authentication:** Requires admin user.
     - **Response:** PaginationResponse[ClientRead] with the list of clients.
     """
-    return await get_clients(db, skip=skip, limit=limit, search=search or "")
+    return json_response(
+        await get_clients(db, skip=skip, limit=limit, search=search or "", cursor=cursor),
+        headers=pagination_headers(skip, cursor)
+    )
@@ -22,7 +22,7 @@ async def send_notification(
         - 500 Internal Server Error if email sending fails.
     """
     try:
-        result = send_notification_email(
+        result = await send_notification_email(
             email=notification.to,
             subject=notification.subject,
             html=notification.body,
@@ -37,7 +37,6 @@ async def send_notification(
             )
             db.add(db_notification)
             await db.commit()
-            await db.refresh(db_notification)
         return NotificationSendResponse(
             success=True,
             message="Email sent successfully",
@@ -1,16 +1,17 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-import app.schemas
 from app.database import get_db
-import app.schemas.common
+from app.utils import json_response, pagination_headers
+from app.schemas.services import ServiceCreate, ServiceRead, PaginatedServices
+from app.schemas.users import UserRead
 from app.services.services import create_service, get_services
 from app.dependencies import get_current_admin, get_current_active_user
 router = APIRouter()
 
 
-@router.post('/', response_model=app.schemas.ServiceRead)
-async def create_service_endpoint(service: app.schemas.ServiceCreate, db: AsyncSession = Depends(get_db), current_user: app.schemas.UserRead = Depends(get_current_admin)):
+@router.post('/', response_model=ServiceRead)
+async def create_service_endpoint(service: ServiceCreate, db: AsyncSession = Depends(get_db), current_user: UserRead = Depends(get_current_admin)):
     """
     Create a new service.
 
@@ -21,23 +22,29 @@ async def create_service_endpoint(service: app.schemas.ServiceCreate, db: AsyncS
     return await create_service(db, service)
 
 
-@router.get('/', response_model=app.schemas.common.PaginationResponse[app.schemas.ServiceRead])
+@router.get('/', response_model=PaginatedServices)
 async def get_services_endpoint(
-    skip: int = 0,
-    limit: int = 20,
+    skip: int = Query(0, ge=0, le=100_000),
+    limit: int = Query(20, ge=1, le=100),
     search: Optional[str] = Query(
         None, description="Search for services by name or description"),
+    cursor: Optional[str] = Query(
+        None, description="Cursor returned as next_cursor by the previous page"),
     db: AsyncSession = Depends(get_db),
-    current_user: app.schemas.UserRead = Depends(get_current_active_user)
+    current_user: UserRead = Depends(get_current_active_user)
 ):
     """
     Get a paginated list of all services. Allows searching by name or description.
 
     - **Query params:**
-        - skip: Number of items to skip (pagination, default: 0)
-        - limit: Maximum number of items to return (default: 20)
+        - skip: Number of items to skip (pagination, default: 0); above 1000 the response carries a Deprecation header, prefer cursor
+        - limit: Maximum number of items to return (default: 20, max: 100)
         - search: Text to search in service name or description
+        - cursor: Keyset cursor from a previous page; when set, skip is ignored
     - **Authentication:** Requires authenticated user.
     - **Response:** PaginationResponse[ServiceRead] with the list of services.
     """
-    return await get_services(db, skip=skip, limit=limit, search=search or '')
+    return json_response(
+        await get_services(db, skip=skip, limit=limit, search=search or '', cursor=cursor),
+        headers=pagination_headers(skip, cursor)
+    )
@@ -1,6 +1,7 @@
 import os
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 from dotenv import load_dotenv
 
 """
@@ -17,7 +18,36 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set.")
 
-engine = create_async_engine(DATABASE_URL, echo=True, future=True)
+# Connection pool settings. Set DB_USE_NULL_POOL=1 when running behind
+# PgBouncer in transaction-pooling mode so it does the pooling instead.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 20))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 40))
+# Seconds to wait for a free connection, and maximum connection age before
+# it is replaced (keeps ahead of server-side idle timeouts).
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_USE_NULL_POOL = os.getenv("DB_USE_NULL_POOL", "0") == "1"
+DB_ECHO = os.getenv("DB_ECHO", "0") == "1"
+# Compiled SQL cache entries per engine (SQLAlchemy's default is 500).
+DB_QUERY_CACHE_SIZE = 1200
+
+if DB_USE_NULL_POOL:
+    engine = create_async_engine(
+        DATABASE_URL, echo=DB_ECHO, future=True, poolclass=NullPool,
+        query_cache_size=DB_QUERY_CACHE_SIZE)
+else:
+    engine = create_async_engine(
+        DATABASE_URL,
+        echo=DB_ECHO,
+        future=True,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=True,
+        pool_recycle=DB_POOL_RECYCLE,
+        query_cache_size=DB_QUERY_CACHE_SIZE,
+    )
 async_sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
 Base = declarative_base()
 
@@ -2,24 +2,88 @@
 Dependency utilities for authentication and authorization in FastAPI routes.
 
 - Provides functions to get the current user from a JWT token.
+- Caches verified tokens and user lookups for a short time to skip repeated work.
 - Checks for active users and admin permissions.
 - Raises appropriate HTTP exceptions for unauthorized or inactive users.
 """
 
+import hashlib
+import time
+from typing import NamedTuple, Optional
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status
-from jose import JWTError, jwt
+import jwt
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
+from app.models.client import Client
 from app.models.user import User
 from app.schemas.users import TokenData
 from app.security import SECRET_KEY, ALGORITHM
+from sqlalchemy import bindparam, lambda_stmt
 from sqlalchemy.future import select
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> User:
+class CurrentUser(NamedTuple):
+    """
+    Lightweight snapshot of the authenticated user shared by the dependency chain.
+    """
+    id: int
+    email: str
+    full_name: Optional[str]
+    role: str
+    is_active: bool
+    client_id: Optional[int]
+
+
+# Cached statement: compiled once, then only the email parameter is re-bound.
+# The client profile id comes from the same query so /auth/me needs no second lookup.
+_current_user_stmt = lambda_stmt(
+    lambda: select(User.id, User.email, User.full_name, User.role, User.is_active, Client.id)
+    .outerjoin(Client, Client.user_id == User.id)
+    .where(User.email == bindparam("email"))
+)
+
+# (TokenData, exp) of already verified tokens, keyed by the token's sha256 digest
+_token_cache = TTLCache(maxsize=50_000, ttl=30)
+# CurrentUser snapshots keyed by email
+_current_user_cache = TTLCache(maxsize=10_000, ttl=30)
+
+
+def _decode_token(token: str) -> TokenData:
+    """
+    Verify a JWT and return its claims, reusing the result of a previous
+    verification of the same token while it has not expired.
+
+    - **Parameters:**
+        - token: JWT access token from the request
+    - **Raises:**
+        - jwt.PyJWTError if the token is invalid or expired
+        - ValueError if the token has no subject
+    - **Returns:**
+        - TokenData with the token's email and role
+    """
+    cache_key = hashlib.sha256(token.encode()).digest()
+    cached = _token_cache.get(cache_key)
+    if cached is not None:
+        token_data, exp = cached
+        if exp is None or exp > time.time():
+            return token_data
+        _token_cache.pop(cache_key, None)
+
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    email: str = payload.get("sub")
+    role: str = payload.get("role")
+    if email is None:
+        raise ValueError("Token has no subject")
+    token_data = TokenData(email=email, role=role)
+    _token_cache[cache_key] = (token_data, payload.get("exp"))
+    return token_data
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> CurrentUser:
     """
     Retrieve the current user based on the JWT token.
 
@@ -29,7 +93,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
     - **Raises:**
         - 401 if credentials are invalid or user is not found
     - **Returns:**
-        - User model instance of the authenticated user
+        - CurrentUser snapshot of the authenticated user
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -37,80 +101,81 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        role: str = payload.get("role")
-        if email is None:
-            raise credentials_exception
-        token_data = TokenData(email=email, role=role)
-    except JWTError:
+        token_data = _decode_token(token)
+    except (jwt.PyJWTError, ValueError):
         raise credentials_exception
 
-    result = await db.execute(select(User).filter(User.email == token_data.email))
-    user = result.scalar_one_or_none()
-    if user is None:
+    user = _current_user_cache.get(token_data.email)
+    if user is not None:
+        return user
+
+    result = await db.execute(_current_user_stmt, {"email": token_data.email})
+    row = result.one_or_none()
+    if row is None:
         raise credentials_exception
+    user = CurrentUser(*row)
+    _current_user_cache[token_data.email] = user
     return user
 
 
-def get_current_active_user(current_user: User = Depends(get_current_user)):
+def get_current_active_user(current_user: CurrentUser = Depends(get_current_user)):
     """
     Ensure the current user is active.
 
     - **Parameters:**
-        - current_user: User model instance
+        - current_user: CurrentUser of the authenticated user
     - **Raises:**
         - 400 if the user is inactive
     - **Returns:**
-        - User model instance if active
+        - CurrentUser if active
     """
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
 
-def get_current_admin(current_user: User = Depends(get_current_user)):
+def get_current_admin(current_user: CurrentUser = Depends(get_current_user)):
     """
     Ensure the current user has admin role.
 
     - **Parameters:**
-        - current_user: User model instance
+        - current_user: CurrentUser of the authenticated user
     - **Raises:**
         - 403 if the user does not have admin role
     - **Returns:**
-        - User model instance if admin
+        - CurrentUser if admin
     """
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not enough permissions")
     return current_user
 
 
-def admin_required(current_user: User = Depends(get_current_active_user)):
+def admin_required(current_user: CurrentUser = Depends(get_current_active_user)):
     """
     Ensure the current user is an active admin.
 
     - **Parameters:**
-        - current_user: User model instance
+        - current_user: CurrentUser of the authenticated user
     - **Raises:**
         - 403 if the user is not an admin
     - **Returns:**
-        - User model instance if active admin
+        - CurrentUser if active admin
     """
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Admin only")
     return current_user
 
 
-def get_current_staff_or_admin(current_user: User = Depends(get_current_active_user)):
+def get_current_staff_or_admin(current_user: CurrentUser = Depends(get_current_active_user)):
     """
     Ensure the current user is either a staff member or an admin.
 
     - **Parameters:**
-        - current_user: User model instance
+        - current_user: CurrentUser of the authenticated user
     - **Raises:**
         - 403 if the user is neither a staff member nor an admin
     - **Returns:**
-        - User model instance if staff or admin
+        - CurrentUser if staff or admin
     """
     if not (current_user.role == 'admin' or current_user.role == 'staff'):
         raise HTTPException(status_code=403, detail="Staff or Admin only")
@@ -1,9 +1,13 @@
 from fastapi import FastAPI
 from app.api.routes import clients, auth, appointments, services, notifications
+from app.database import engine
+from app.security import benchmark_password_hash
+from app.services.notifications import close_http_client
+import asyncio
 import os
-import resend
 from dotenv import load_dotenv
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 load_dotenv()
 
@@ -11,18 +15,29 @@ load_dotenv()
 RESEND_API_KEY = os.getenv("RESEND_API_KEY")
 if not RESEND_API_KEY:
     raise RuntimeError("RESEND_API_KEY environment variable is not set.")
-resend.api_key = RESEND_API_KEY
 
 
-app = FastAPI(title="Manicure Booking API", version="1.0.0")
+ENV = os.getenv("ENV", "dev")
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:5173,https://tudominio.com").split(",")
+    if origin.strip()
+]
+
+app = FastAPI(
+    title="Manicure Booking API",
+    version="1.0.0",
+    openapi_url=None if ENV == "prod" else "/openapi.json",
+)
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:5173", "https://tudominio.com"],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(clients.router, prefix="/clients", tags=["clients"])
@@ -31,3 +46,24 @@ app.include_router(appointments.router,
 app.include_router(services.router, prefix="/services", tags=["services"])
 app.include_router(notifications.router,
                    prefix="/notifications", tags=["notifications"])
+
+
+@app.on_event("startup")
+async def startup():
+    """
+    Build the OpenAPI schema once so the first /docs request does not pay for it,
+    and log how long a password hash takes with the configured cost.
+    """
+    if app.openapi_url:
+        app.openapi()
+    await asyncio.to_thread(benchmark_password_hash)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """
+    Close all pooled database connections and the Resend HTTP client when the
+    application stops.
+    """
+    await engine.dispose()
+    await close_http_client()
@@ -1,26 +1,45 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Index, text
+from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
-from datetime import datetime
 from app.models.appointment_services import appointment_services
 
 
 class Appointment(Base):
     __tablename__ = 'appointments'
+    __table_args__ = (
+        Index('ix_appointments_created_at_id', 'created_at', 'id'),
+        Index('ix_appointments_status_client_id_date',
+              'status', 'client_id', 'date'),
+        Index('ix_appointments_time_range', text('tstzrange(date, end_time)'),
+              postgresql_using='gist',
+              postgresql_where=text("status <> 'cancelled'")
+              ).ddl_if(dialect='postgresql'),
+        Index('ix_appointments_notes_trgm', 'notes', postgresql_using='gin',
+              postgresql_ops={'notes': 'gin_trgm_ops'}),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    client_id = Column(Integer, ForeignKey('clients.id'), nullable=False)
-    date = Column(DateTime, nullable=False)
+    client_id = Column(Integer, ForeignKey(
+        'clients.id'), nullable=False, index=True)
+    date = Column(DateTime(timezone=True), nullable=False)
+    end_time = Column(DateTime(timezone=True), nullable=True)
+    total_duration = Column(Integer, nullable=False,
+                            default=0, server_default='0')
     status = Column(String, default='pending')
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow,
-                        onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(),
+                        onupdate=func.now())
     notes = Column(Text, nullable=True)
-    client = relationship("Client", back_populates="appointments")
+    client = relationship(
+        "Client", back_populates="appointments", lazy="raise_on_sql")
     services = relationship(
         "Service",
         secondary=appointment_services,
-        back_populates="appointments"
+        back_populates="appointments",
+        lazy="raise_on_sql",
+        passive_deletes=True
     )
     cancelation = relationship(
-        "Cancelation", uselist=False, back_populates="appointment")
+        "Cancelation", uselist=False, back_populates="appointment",
+        lazy="raise_on_sql", passive_deletes=True)
@@ -1,7 +1,7 @@
 from sqlalchemy import Column, Integer, Text, ForeignKey, DateTime
+from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
-from datetime import datetime
 
 
 class Cancelation(Base):
@@ -11,6 +11,7 @@ class Cancelation(Base):
     appointment_id = Column(Integer, ForeignKey(
         'appointments.id', ondelete='CASCADE'), nullable=False)
     reason = Column(Text, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    appointment = relationship('Appointment', back_populates='cancelation')
+    appointment = relationship(
+        'Appointment', back_populates='cancelation', lazy='raise_on_sql')
@@ -1,11 +1,18 @@
-from sqlalchemy import Column, Integer, String, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from datetime import datetime
 from app.database import Base
 
 
 class Client(Base):
     __tablename__ = 'clients'
+    __table_args__ = (
+        Index('ix_clients_created_at_id', 'created_at', 'id'),
+        Index('ix_clients_name_trgm', 'name', postgresql_using='gin',
+              postgresql_ops={'name': 'gin_trgm_ops'}),
+        Index('ix_clients_email_trgm', 'email', postgresql_using='gin',
+              postgresql_ops={'email': 'gin_trgm_ops'}),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey(
@@ -14,8 +21,10 @@ class Client(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     phone = Column(String, nullable=True)
     address = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow,
-                        onupdate=datetime.utcnow)
-    user = relationship('User', back_populates='client')
-    appointments = relationship("Appointment", back_populates="client")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(),
+                        onupdate=func.now())
+    user = relationship(
+        'User', back_populates='client', lazy='raise_on_sql')
+    appointments = relationship(
+        "Appointment", back_populates="client", lazy="raise_on_sql")
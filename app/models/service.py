@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Text
+from sqlalchemy import Column, Integer, String, Float, Text, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 from app.models.appointment_services import appointment_services
@@ -6,6 +6,10 @@ from app.models.appointment_services import appointment_services
 
 class Service(Base):
     __tablename__ = 'services'
+    __table_args__ = (
+        Index('ix_services_name_trgm', 'name', postgresql_using='gin',
+              postgresql_ops={'name': 'gin_trgm_ops'}),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False, unique=True)
@@ -16,5 +20,7 @@ class Service(Base):
     appointments = relationship(
         "Appointment",
         secondary=appointment_services,
-        back_populates="services"
+        back_populates="services",
+        lazy="raise_on_sql",
+        passive_deletes=True
     )
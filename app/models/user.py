@@ -1,6 +1,6 @@
 from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy.sql import func
 from app.database import Base
-from datetime import datetime
 from sqlalchemy.orm import relationship
 
 
@@ -13,6 +13,8 @@ class User(Base):
     full_name = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
     role = Column(String, default='client')  # 'client', 'staff', 'admin'
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    client = relationship('Client', back_populates='user', uselist=False)
+    client = relationship(
+        'Client', back_populates='user', uselist=False,
+        lazy='raise_on_sql', passive_deletes=True)
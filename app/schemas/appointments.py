@@ -1,8 +1,9 @@
 from typing import Optional, List
-from pydantic import BaseModel, field_validator, computed_field
+from pydantic import BaseModel, field_validator, computed_field, ConfigDict
 from datetime import datetime
 from app.schemas.clients import ClientRead
 from app.schemas.services import ServiceRead
+from app.schemas.common import PaginationResponse
 
 
 class AppointmentBase(BaseModel):
@@ -29,8 +30,7 @@ class AppointmentRead(AppointmentBase):
     def service_ids(self) -> List[int]:
         return [s.id for s in self.services or []]
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class AppointmentUpdate(BaseModel):
@@ -40,6 +40,15 @@ class AppointmentUpdate(BaseModel):
     service_ids: Optional[List[int]] = None
     cancelled: Optional[bool] = None
 
+    @field_validator('date')
+    @classmethod
+    def date_not_null(cls, v):
+        # Only runs when date is sent; an explicit null would leave the
+        # appointment without a start time
+        if v is None:
+            raise ValueError("Date cannot be null")
+        return v
+
     @field_validator('status')
     @classmethod
     def status_allowed(cls, v):
@@ -48,10 +57,12 @@ class AppointmentUpdate(BaseModel):
             raise ValueError(f"Status must be one of {allowed}")
         return v
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class BlockedSlot(BaseModel):
-    start: str
-    end: str
+    start: datetime
+    end: datetime
+
+
+PaginatedAppointments = PaginationResponse[AppointmentRead]
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, ConfigDict
 from typing import Optional
+from app.schemas.common import PaginationResponse
 from datetime import datetime
 
 
@@ -21,5 +22,7 @@ class ClientRead(ClientCreate):
     id: int
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+
+PaginatedClients = PaginationResponse[ClientRead]
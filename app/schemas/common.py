@@ -1,6 +1,5 @@
 from pydantic import BaseModel
 from typing import Optional, List, TypeVar, Generic
-from pydantic.generics import GenericModel
 
 T = TypeVar('T')
 
@@ -12,6 +11,7 @@ class PaginationInfo(BaseModel):
     total_pages: int
 
 
-class PaginationResponse(GenericModel, Generic[T]):
-    info: PaginationInfo
+class PaginationResponse(BaseModel, Generic[T]):
+    info: Optional[PaginationInfo] = None
     data: List[T]
+    next_cursor: Optional[str] = None
@@ -1,5 +1,6 @@
 from typing import Optional
-from pydantic import BaseModel
+from app.schemas.common import PaginationResponse
+from pydantic import BaseModel, ConfigDict
 
 
 class ServiceBase(BaseModel):
@@ -16,5 +17,7 @@ class ServiceCreate(ServiceBase):
 class ServiceRead(ServiceBase):
     id: int
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+
+PaginatedServices = PaginationResponse[ServiceRead]
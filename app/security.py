@@ -3,12 +3,27 @@ Security utilities for password hashing, verification, and JWT token creation.
 
 - Loads security settings from environment variables.
 - Provides functions for password hashing and verification.
-- Handles JWT access token creation with expiration.
+- Caches successful password verifications for a few minutes.
+- Runs password hashing work on a dedicated thread pool for async callers.
+- Reads hashing cost parameters from the environment and benchmarks them at startup.
+- Handles JWT access token creation with expiration (HS256 tokens are signed
+  directly with hmac instead of going through PyJWT).
 """
 
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache
 from passlib.context import CryptContext
-from datetime import datetime, timedelta
-from jose import JWTError, jwt
+from datetime import timedelta
+import jwt
 import os
 from dotenv import load_dotenv
 
@@ -17,8 +32,43 @@ ALGORITHM = os.getenv('ALGORITHM', 'HS256')
 if not SECRET_KEY:
     raise ValueError("SECRET_KEY environment variable is not set.")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv('ACCESS_TOKEN_EXPIRE_MINUTES', 30))
+ACCESS_TOKEN_EXPIRE_SECONDS = ACCESS_TOKEN_EXPIRE_MINUTES * 60
 
-pws_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashing cost. Tune per deployment so one hash takes roughly 250 ms or less;
+# stored hashes with other parameters are upgraded on the next login.
+ARGON2_TIME_COST = int(os.getenv('ARGON2_TIME_COST', 2))
+ARGON2_MEMORY_COST = int(os.getenv('ARGON2_MEMORY_COST', 19456))
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 10))
+
+logger = logging.getLogger(__name__)
+
+_KEY_BYTES = SECRET_KEY.encode()
+
+# New hashes use Argon2id; bcrypt hashes still verify and are flagged for
+# rehashing (see needs_rehash) so they migrate as users log in.
+pws_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated=["bcrypt"],
+    argon2__memory_cost=ARGON2_MEMORY_COST,
+    argon2__time_cost=ARGON2_TIME_COST,
+    argon2__parallelism=1,
+    bcrypt__rounds=BCRYPT_ROUNDS,
+)
+
+# Verified in place of a real hash when the email is unknown, so failed logins
+# take the same time whether or not the account exists.
+DUMMY_PASSWORD_HASH = pws_context.hash(secrets.token_urlsafe(32))
+
+# HMAC digests of (password, hash) pairs that verified successfully.
+# Failures are never cached so brute-force attempts still pay the full hashing cost.
+_verified_cache = TTLCache(maxsize=4096, ttl=300)
+_verified_cache_lock = threading.Lock()
+
+# Password hashing and verification (argon2, plus legacy bcrypt hashes) release
+# the GIL, so one thread per core works in parallel without competing with other
+# to_thread work on the loop's default executor.
+_hash_pool = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1, thread_name_prefix="password-hash")
 
 
 def verify_password(plan_password, hashed_password):
@@ -34,6 +84,33 @@ def verify_password(plan_password, hashed_password):
     return pws_context.verify(plan_password, hashed_password)
 
 
+def verify_password_cached(plan_password, hashed_password):
+    """
+    Verify a plain password against a hashed password, skipping the hash check when
+    the same pair was verified successfully in the last few minutes.
+    Only an HMAC of the pair is kept in memory, never the plain password.
+
+    - **Parameters:**
+        - plan_password: The plain text password to verify
+        - hashed_password: The hashed password to compare against
+    - **Returns:**
+        - True if the password matches, False otherwise
+    """
+    key = hmac.new(
+        _KEY_BYTES,
+        plan_password.encode() + b"|" + hashed_password.encode(),
+        hashlib.sha256
+    ).digest()
+    with _verified_cache_lock:
+        if key in _verified_cache:
+            return True
+    if not pws_context.verify(plan_password, hashed_password):
+        return False
+    with _verified_cache_lock:
+        _verified_cache[key] = True
+    return True
+
+
 def get_password_hash(password):
     """
     Hash a plain password using the configured password context.
@@ -46,6 +123,83 @@ def get_password_hash(password):
     return pws_context.hash(password)
 
 
+def benchmark_password_hash(samples: int = 5):
+    """
+    Time the current hashing settings and log the average at INFO level.
+
+    - **Parameters:**
+        - samples: Number of hashes to compute
+    - **Returns:**
+        - Average seconds per hash
+    """
+    start = time.perf_counter()
+    for _ in range(samples):
+        pws_context.hash("benchmark-password")
+    average = (time.perf_counter() - start) / samples
+    logger.info(
+        "Password hashing takes %.1f ms (argon2 time_cost=%s, memory_cost=%s KiB)",
+        average * 1000, ARGON2_TIME_COST, ARGON2_MEMORY_COST)
+    return average
+
+
+def needs_rehash(hashed_password):
+    """
+    Check whether a stored hash uses a deprecated scheme or outdated parameters.
+
+    - **Parameters:**
+        - hashed_password: The stored password hash
+    - **Returns:**
+        - True if the password should be hashed again with the current settings
+    """
+    return pws_context.needs_update(hashed_password)
+
+
+async def averify_password(plan_password, hashed_password):
+    """
+    Async wrapper of verify_password_cached that runs on the password hashing thread pool.
+
+    - **Parameters:**
+        - plan_password: The plain text password to verify
+        - hashed_password: The hashed password to compare against
+    - **Returns:**
+        - True if the password matches, False otherwise
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, verify_password_cached, plan_password, hashed_password)
+
+
+async def aget_password_hash(password):
+    """
+    Async wrapper of get_password_hash that runs on the password hashing thread pool.
+
+    - **Parameters:**
+        - password: The plain text password to hash
+    - **Returns:**
+        - The hashed password string
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, get_password_hash, password)
+
+
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+_HS256_HEADER_B64 = _b64url(json.dumps(
+    {"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+
+
+def _encode_hs256(payload: dict) -> str:
+    """
+    Sign a JWT with HS256 using a precomputed header and key.
+    Produces the same token format PyJWT does.
+    """
+    payload_b64 = _b64url(json.dumps(payload, separators=(",", ":")).encode())
+    signing_input = _HS256_HEADER_B64 + b"." + payload_b64
+    signature = _b64url(hmac.new(_KEY_BYTES, signing_input, hashlib.sha256).digest())
+    return (signing_input + b"." + signature).decode()
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     """
     Create a JWT access token with an expiration time.
@@ -57,10 +211,9 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
         - Encoded JWT token as a string
     """
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    lifetime = int(expires_delta.total_seconds()) if expires_delta else ACCESS_TOKEN_EXPIRE_SECONDS
+    to_encode["exp"] = int(time.time()) + lifetime
+    if ALGORITHM == "HS256":
+        return _encode_hs256(to_encode)
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
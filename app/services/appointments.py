@@ -1,39 +1,67 @@
-from fastapi import HTTPException
+from fastapi import BackgroundTasks, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
 import app.models
-from sqlalchemy import func
+from sqlalchemy import DateTime, bindparam, exists, func, lambda_stmt, literal
+from typing import Optional
+from app.schemas.appointments import PaginatedAppointments
+from pydantic import TypeAdapter
 import app.schemas
 from datetime import datetime, timedelta, timezone
-from app.utils import make_naive
 import app.schemas.appointments
 import app.schemas.common
 import app.schemas.users
-from app.utils import render_appointment_email
-from app.services.notifications import send_notification_email
+from app.utils import make_aware, render_appointment_email, encode_cursor, decode_cursor, keyset_before
+from app.services.notifications import send_notification_email_in_background
 from app.models.cancelation import Cancelation
 from app.schemas.cancelation import CancelationRead
 from app.models.appointment import Appointment
 from app.models.client import Client
-from app.utils import make_naive
 
-
-async def create_appointment(db: AsyncSession, appointment: app.schemas.AppointmentCreate):
+_client_by_user_id_stmt = lambda_stmt(
+    lambda: select(Client).where(Client.user_id == bindparam("user_id"))
+)
+
+_APPOINTMENT_LIST_ADAPTER = TypeAdapter(list[app.schemas.appointments.AppointmentRead])
+
+# Eager loads needed to build an AppointmentRead. The client is joined into
+# the main query and only loads the ClientRead columns; services are a
+# collection, so they keep a separate IN query and are needed whole by ServiceRead.
+_CLIENT_READ_COLUMNS = (
+    Client.id, Client.name, Client.email, Client.phone, Client.address, Client.created_at,
+)
+_appointment_read_options = (
+    joinedload(app.models.Appointment.client).load_only(
+        *_CLIENT_READ_COLUMNS, raiseload=True),
+    selectinload(app.models.Appointment.services),
+)
+# Same loads for queries that already join clients explicitly: the client is
+# populated from that join instead of a second aliased one.
+_appointment_read_options_joined_client = (
+    contains_eager(app.models.Appointment.client).load_only(
+        *_CLIENT_READ_COLUMNS, raiseload=True),
+    selectinload(app.models.Appointment.services),
+)
+
+
+async def create_appointment(db: AsyncSession, appointment: app.schemas.AppointmentCreate, background_tasks: BackgroundTasks | None = None):
     """
     Create a new appointment for a client with selected services.
 
     - **Parameters:**
         - db: AsyncSession database session
         - appointment: AppointmentCreate object with appointment details
+        - background_tasks: When given, a confirmation email is sent to the client after the response
     - **Raises:**
         - 404 if client or any service is not found
         - 400 if no services are selected or time slot is not available
     - **Returns:**
         - The created Appointment model instance
     """
-    client = await db.execute(select(app.models.Client).filter_by(id=appointment.client_id))
-    if not client.scalar_one_or_none():
+    result = await db.execute(select(app.models.Client).filter_by(id=appointment.client_id))
+    client = result.scalar_one_or_none()
+    if not client:
         raise HTTPException(status_code=404, detail="Client not found")
 
     if not appointment.service_ids:
@@ -47,152 +75,215 @@ async def create_appointment(db: AsyncSession, appointment: app.schemas.Appointm
             status_code=404, detail="One or more services not found")
 
     total_duration = sum(service.duration for service in services_found)
-    appointment_start = make_naive(appointment.date)
-    appointment_end = make_naive(
-        appointment_start + timedelta(minutes=total_duration))
-
-    q = (
-        select(app.models.Appointment)
-        .join(app.models.Appointment.services)
-        .filter(
-            app.models.Appointment.status != "cancelled",
-            app.models.Appointment.date < appointment_end,
-        )
-        .group_by(app.models.Appointment.id)
-        .having(
-            (app.models.Appointment.date + func.make_interval(
-                0, 0, 0, 0, 0, 0, func.sum(app.models.Service.duration*60)
-            )) > appointment_start,
-            func.count(app.models.Service.id) > 0
-        )
-    )
-    result = await db.execute(q)
-    if result.scalars().first():
+    appointment_start = make_aware(appointment.date)
+    appointment_end = appointment_start + timedelta(minutes=total_duration)
+
+    overlapping = select(exists().where(
+        app.models.Appointment.status != "cancelled",
+        func.tstzrange(app.models.Appointment.date, app.models.Appointment.end_time)
+        .op("&&")(func.tstzrange(
+            literal(appointment_start, DateTime(timezone=True)),
+            literal(appointment_end, DateTime(timezone=True))
+        ))
+    ))
+    if await db.scalar(overlapping):
         raise HTTPException(
             status_code=400,
             detail="This time slot is not available due to another appointment."
         )
     db_appointment = app.models.Appointment(
-        client_id=appointment.client_id,
-        date=make_naive(appointment.date),
+        client=client,
+        date=appointment_start,
+        end_time=appointment_end,
+        total_duration=total_duration,
         notes=appointment.notes,
         services=services_found,
     )
     db.add(db_appointment)
     await db.commit()
+
+    if background_tasks is not None:
+        background_tasks.add_task(
+            _send_confirmation_email,
+            email=client.email,
+            name=client.name,
+            date=db_appointment.date.strftime("%d-%m-%Y %H:%M"),
+            services=", ".join([s.name for s in services_found]),
+        )
+
+    return db_appointment
+
+
+async def _send_confirmation_email(email: str, name: str, date: str, services: str):
+    """
+    Render and send the booking confirmation email. Runs as a background task
+    so the template is rendered after the response has been sent.
     """
-    html_body = render_appointment_email(
-        name=db_appointment.client.name,
-        date=db_appointment.date.strftime("%d-%m-%Y %H:%M"),
-        services=", ".join([s.name for s in db_appointment.services]),
+    html_body = await render_appointment_email(
+        name=name,
+        date=date,
+        services=services,
         link=f"https://tudominio.com/mis-citas"
     )
-
-    send_notification_email(
-        email=db_appointment.client.email,
+    await send_notification_email_in_background(
+        email=email,
         subject="¡Tu cita ha sido reservada!",
-        html_body=html_body,
+        html=html_body,
     )
-    """
 
-    result = await db.execute(
-        select(app.models.Appointment)
-        .options(
-            selectinload(app.models.Appointment.client),
-            selectinload(app.models.Appointment.services)
-        )
-        .where(app.models.Appointment.id == db_appointment.id)
-    )
-    db_appointment = result.scalar_one_or_none()
-    return db_appointment
 
-
-async def get_appointments(db: AsyncSession, skip=0, limit=100, search="") -> app.schemas.common.PaginationResponse[app.schemas.AppointmentRead]:
+async def get_appointments(db: AsyncSession, skip=0, limit=100, search="", cursor: Optional[str] = None) -> PaginatedAppointments:
     """
     Retrieve a paginated list of all appointments, optionally filtered by client name.
 
+    Appointments are ordered newest first. When a cursor is given, keyset
+    pagination is used and no total count is computed.
+
     - **Parameters:**
         - db: AsyncSession database session
         - skip: Number of items to skip (pagination)
-        - limit: Maximum number of items to return
+        - limit: Maximum number of items to return (capped at 100)
         - search: Filter by client name (optional)
+        - cursor: Opaque cursor returned as next_cursor by a previous page (optional)
     - **Returns:**
         - PaginationResponse[AppointmentRead] with appointment data and pagination info
     """
-    query = select(app.models.Appointment).options(selectinload(
-        app.models.Appointment.client), selectinload(app.models.Appointment.services))
+    limit = min(limit, 100)
+    query = select(app.models.Appointment)
     if search:
         query = query.join(app.models.Client).filter(
-            app.models.Client.name.ilike(f"%{search}%"))
+            app.models.Client.name.ilike(f"%{search}%")).options(
+            *_appointment_read_options_joined_client)
+    else:
+        query = query.options(*_appointment_read_options)
+    query = query.order_by(app.models.Appointment.created_at.desc(),
+                           app.models.Appointment.id.desc())
 
-    total_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(total_query)
+    if cursor:
+        return await _get_appointments_after_cursor(db, query, limit, cursor)
 
-    paginated_query = query.offset(skip).limit(limit)
-    result = await db.execute(paginated_query)
-    items = result.scalars().all()
+    result = await db.execute(
+        query.add_columns(func.count().over().label("total"))
+        .offset(skip).limit(limit)
+    )
+    rows = result.all()
+    items = [row[0] for row in rows]
+    if rows:
+        total = rows[0].total
+    elif skip:
+        total = await db.scalar(
+            query.with_only_columns(func.count(app.models.Appointment.id)).order_by(None))
+    else:
+        total = 0
 
     page = (skip // limit) + 1 if limit else 1
     total_pages = (total + limit - 1) // limit if limit else 1
-    return app.schemas.common.PaginationResponse[app.schemas.appointments.AppointmentRead](
+    has_more = skip + len(items) < total
+    return PaginatedAppointments(
         info=app.schemas.common.PaginationInfo(
             page=page,
             per_page=limit,
             total=total,
             total_pages=total_pages
         ),
-        data=[app.schemas.appointments.AppointmentRead.model_validate(
-            item, from_attributes=True) for item in items]
+        data=_APPOINTMENT_LIST_ADAPTER.validate_python(items, from_attributes=True),
+        next_cursor=encode_cursor(
+            items[-1].created_at, items[-1].id) if has_more and items else None
     )
 
 
 async def get_my_appointments(
     db: AsyncSession,
-    client_id: int,
+    user_id: int,
     skip: int = 0,
     limit: int = 100,
-    search: str = ""
-) -> app.schemas.common.PaginationResponse[app.schemas.appointments.AppointmentRead]:
+    search: str = "",
+    cursor: Optional[str] = None
+) -> PaginatedAppointments:
     """
-    Retrieve a paginated list of appointments for a specific client, optionally filtered by notes.
+    Retrieve a paginated list of appointments for the client profile of a user, optionally filtered by notes.
+
+    Appointments are ordered newest first. When a cursor is given, keyset
+    pagination is used and no total count is computed.
 
     - **Parameters:**
         - db: AsyncSession database session
-        - client_id: ID of the client
+        - user_id: ID of the user owning the client profile
         - skip: Number of items to skip (pagination)
-        - limit: Maximum number of items to return
+        - limit: Maximum number of items to return (capped at 100)
         - search: Filter by notes (optional)
+        - cursor: Opaque cursor returned as next_cursor by a previous page (optional)
     - **Returns:**
         - PaginationResponse[AppointmentRead] with appointment data and pagination info
     """
-    query = select(app.models.Appointment).options(
-        selectinload(app.models.Appointment.client),
-        selectinload(app.models.Appointment.services)
-    ).where(app.models.Appointment.client_id == client_id)
+    limit = min(limit, 100)
+    query = select(app.models.Appointment).join(
+        Client, Client.id == app.models.Appointment.client_id
+    ).options(*_appointment_read_options_joined_client).where(Client.user_id == user_id)
 
     if search:
         query = query.filter(
             app.models.Appointment.notes.ilike(f"%{search}%"))
+    query = query.order_by(app.models.Appointment.created_at.desc(),
+                           app.models.Appointment.id.desc())
 
-    total_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(total_query)
+    if cursor:
+        return await _get_appointments_after_cursor(db, query, limit, cursor)
 
-    paginated_query = query.offset(skip).limit(limit)
-    result = await db.execute(paginated_query)
-    items = result.scalars().all()
+    result = await db.execute(
+        query.add_columns(func.count().over().label("total"))
+        .offset(skip).limit(limit)
+    )
+    rows = result.all()
+    items = [row[0] for row in rows]
+    if rows:
+        total = rows[0].total
+    elif skip:
+        total = await db.scalar(
+            query.with_only_columns(func.count(app.models.Appointment.id)).order_by(None))
+    else:
+        total = 0
 
     page = (skip // limit) + 1 if limit else 1
     total_pages = (total + limit - 1) // limit if limit else 1
+    has_more = skip + len(items) < total
 
-    return app.schemas.common.PaginationResponse[app.schemas.appointments.AppointmentRead](
+    return PaginatedAppointments(
         info=app.schemas.common.PaginationInfo(
             page=page,
             per_page=limit,
             total=total,
             total_pages=total_pages
         ),
-        data=[app.schemas.appointments.AppointmentRead.model_validate(
-            item, from_attributes=True) for item in items]
+        data=_APPOINTMENT_LIST_ADAPTER.validate_python(items, from_attributes=True),
+        next_cursor=encode_cursor(
+            items[-1].created_at, items[-1].id) if has_more and items else None
+    )
+
+
+async def _get_appointments_after_cursor(
+    db: AsyncSession,
+    query,
+    limit: int,
+    cursor: str
+) -> PaginatedAppointments:
+    """
+    Fetch the page of appointments that follows the given keyset cursor.
+    One extra row is fetched to know whether a next page exists.
+    """
+    created_at, last_id = decode_cursor(cursor)
+    result = await db.execute(
+        query.where(keyset_before(app.models.Appointment.created_at,
+                              app.models.Appointment.id, created_at, last_id))
+        .limit(limit + 1)
+    )
+    items = result.scalars().all()
+    has_more = len(items) > limit
+    items = items[:limit]
+    return PaginatedAppointments(
+        data=_APPOINTMENT_LIST_ADAPTER.validate_python(items, from_attributes=True),
+        next_cursor=encode_cursor(
+            items[-1].created_at, items[-1].id) if has_more and items else None
     )
 
 
@@ -211,15 +302,16 @@ async def update_appointment(
         - appointment_in: AppointmentUpdate object with fields to update
         - current_user: UserRead object of the current user
     - **Raises:**
-        - 404 if appointment is not found
+        - 404 if appointment or any service is not found
         - 403 if user is not authorized
+        - 400 if an empty service list is given
     - **Returns:**
         - AppointmentRead object with updated appointment data
     """
     result = await db.execute(
         select(app.models.Appointment)
         .where(app.models.Appointment.id == appointment_id)
-        .options(selectinload(app.models.Appointment.client), selectinload(app.models.Appointment.services))
+        .options(*_appointment_read_options)
     )
 
     appointment = result.scalar_one_or_none()
@@ -230,11 +322,30 @@ async def update_appointment(
         raise HTTPException(
             status_code=403, detail="Not authorized to update this appointment")
 
-    for field, value in appointment_in.model_dump(exclude_unset=True).items():
-        setattr(appointment, field, value)
+    fields_set = appointment_in.model_fields_set
+    service_ids = appointment_in.service_ids
+    if service_ids is not None:
+        if not service_ids:
+            raise HTTPException(
+                status_code=400, detail="At least one service must be selected")
+        result = await db.execute(select(app.models.Service).filter(app.models.Service.id.in_(service_ids)))
+        services_found = result.scalars().all()
+        if len(services_found) != len(service_ids):
+            raise HTTPException(
+                status_code=404, detail="One or more services not found")
+        appointment.services = services_found
+        appointment.total_duration = sum(
+            service.duration for service in services_found)
+
+    for field in fields_set - {"service_ids"}:
+        setattr(appointment, field, getattr(appointment_in, field))
+
+    if "date" in fields_set or service_ids is not None:
+        appointment.date = make_aware(appointment.date)
+        appointment.end_time = appointment.date + \
+            timedelta(minutes=appointment.total_duration)
 
     await db.commit()
-    await db.refresh(appointment)
     return app.schemas.appointments.AppointmentRead.model_validate(appointment)
 
 
@@ -262,7 +373,7 @@ async def delete_appointment(
     if not appointment:
         raise HTTPException(status_code=404, detail="Appointment not found")
 
-    client = await db.execute(select(Client).where(Client.user_id == current_user.id))
+    client = await db.execute(_client_by_user_id_stmt, {"user_id": current_user.id})
     client = client.scalar_one_or_none()
     if not (current_user.role == 'admin' or (client and appointment.client_id == client.id)):
         raise HTTPException(
@@ -295,7 +406,6 @@ async def cancel_appointment(
     result = await db.execute(
         select(app.models.Appointment)
         .where(app.models.Appointment.id == appointment_id)
-        .options(selectinload(app.models.Appointment.client))
     )
 
     appointment = result.scalar_one_or_none()
@@ -310,8 +420,8 @@ async def cancel_appointment(
         raise HTTPException(
             status_code=400, detail="Appointment is already cancelled")
 
-    now = make_naive(datetime.now())
-    if make_naive(appointment.date) - now <= timedelta(hours=3):
+    now = datetime.now(timezone.utc)
+    if make_aware(appointment.date) - now <= timedelta(hours=3):
         raise HTTPException(
             status_code=400,
             detail="Cannot cancel appointment less than 3 hours before the scheduled time"
@@ -324,11 +434,6 @@ async def cancel_appointment(
     )
     db.add(cancelation)
     await db.commit()
-    await db.refresh(cancelation)
-
-    # Update appointment status to cancelled
-    appointment.status = "cancelled"
-    await db.commit()
 
     return CancelationRead.model_validate(cancelation, from_attributes=True)
 
@@ -352,10 +457,7 @@ async def complete_appointment(
     """
     result = await db.execute(
         select(app.models.Appointment)
-        .options(
-            selectinload(app.models.Appointment.client),
-            selectinload(app.models.Appointment.services)
-        )
+        .options(*_appointment_read_options)
         .where(app.models.Appointment.id == appointment_id)
     )
 
@@ -373,6 +475,5 @@ async def complete_appointment(
 
     appointment.status = "completed"
     await db.commit()
-    await db.refresh(appointment)
 
     return app.schemas.appointments.AppointmentRead.model_validate(appointment)
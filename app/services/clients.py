@@ -6,9 +6,15 @@ import app.schemas
 import app.schemas.clients
 import app.schemas.common
 from sqlalchemy import func
+from typing import Optional
+from app.schemas.clients import PaginatedClients
+from pydantic import TypeAdapter
+from app.utils import dialect_insert, encode_cursor, decode_cursor, keyset_before
 
+_CLIENT_LIST_ADAPTER = TypeAdapter(list[app.schemas.clients.ClientRead])
 
-async def create_client(db: AsyncSession, client: app.schemas.ClientCreate, user_id: int):
+
+async def create_client(db: AsyncSession, client: app.schemas.ClientCreate, user_id: int, commit: bool = True):
     """
     Create a new client and associate it with a user.
 
@@ -16,25 +22,30 @@ async def create_client(db: AsyncSession, client: app.schemas.ClientCreate, user
         - db: AsyncSession database session
         - client: ClientCreate object with client details
         - user_id: ID of the associated user
+        - commit: Commit the transaction; when False the client is inserted but left uncommitted so the caller can commit it together with other writes
     - **Raises:**
         - 400 if a client with the same email already exists
     - **Returns:**
         - The created Client model instance
     """
-    result = await db.execute(select(app.models.Client).filter_by(email=client.email))
-    if result.scalar_one_or_none():
+    stmt = (
+        dialect_insert(db, app.models.Client)
+        .values(
+            user_id=user_id,
+            name=client.name,
+            email=client.email,
+            phone=client.phone,
+            address=client.address,
+        )
+        .on_conflict_do_nothing(index_elements=["email"])
+        .returning(app.models.Client)
+    )
+    new_client = (await db.execute(stmt)).scalar_one_or_none()
+    if new_client is None:
         raise HTTPException(
             status_code=400, detail="Client with this email already exists")
-    new_client = app.models.Client(
-        user_id=user_id,
-        name=client.name,
-        email=client.email,
-        phone=client.phone,
-        address=client.address,
-    )
-    db.add(new_client)
-    await db.commit()
-    await db.refresh(new_client)
+    if commit:
+        await db.commit()
     return new_client
 
 
@@ -42,38 +53,74 @@ async def get_clients(
     db: AsyncSession,
     skip: int = 0,
     limit: int = 20,
-    search: str = ""
-) -> app.schemas.common.PaginationResponse[app.schemas.clients.ClientRead]:
+    search: str = "",
+    cursor: Optional[str] = None
+) -> PaginatedClients:
     """
     Retrieve a paginated list of clients, optionally filtered by email.
 
+    Clients are ordered newest first. When a cursor is given, keyset pagination
+    is used and no total count is computed.
+
     - **Parameters:**
         - db: AsyncSession database session
         - skip: Number of items to skip (pagination)
-        - limit: Maximum number of items to return
+        - limit: Maximum number of items to return (capped at 100)
         - search: Filter by client email (optional)
+        - cursor: Opaque cursor returned as next_cursor by a previous page (optional)
     - **Returns:**
         - PaginationResponse[ClientRead] with client data and pagination info
     """
-    query = select(app.models.Client)
+    limit = min(limit, 100)
+    query = select(app.models.Client).order_by(
+        app.models.Client.created_at.desc(), app.models.Client.id.desc())
     if search:
         query = query.where(app.models.Client.email.ilike(f"%{search}%"))
 
-    total = await db.scalar(select(func.count()).select_from(query.subquery()))
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        result = await db.execute(
+            query.where(keyset_before(app.models.Client.created_at,
+                                  app.models.Client.id, created_at, last_id))
+            .limit(limit + 1)
+        )
+        items = result.scalars().all()
+        has_more = len(items) > limit
+        items = items[:limit]
+        return PaginatedClients(
+            data=_CLIENT_LIST_ADAPTER.validate_python(items, from_attributes=True),
+            next_cursor=encode_cursor(
+                items[-1].created_at, items[-1].id) if has_more and items else None
+        )
 
-    result = await db.execute(query.offset(skip).limit(limit))
-    items = result.scalars().all()
+    # COUNT(*) OVER () returns the total with the page in one query; only an
+    # empty page past the first one needs a separate count.
+    result = await db.execute(
+        query.add_columns(func.count().over().label("total"))
+        .offset(skip).limit(limit)
+    )
+    rows = result.all()
+    items = [row[0] for row in rows]
+    if rows:
+        total = rows[0].total
+    elif skip:
+        total = await db.scalar(
+            query.with_only_columns(func.count(app.models.Client.id)).order_by(None))
+    else:
+        total = 0
 
     page = (skip // limit) + 1 if limit else 1
     total_pages = (total + limit - 1) // limit if limit else 1
+    has_more = skip + len(items) < total
 
-    return app.schemas.common.PaginationResponse[app.schemas.clients.ClientRead](
+    return PaginatedClients(
         info=app.schemas.common.PaginationInfo(
             page=page,
             per_page=limit,
             total=total,
             total_pages=total_pages
         ),
-        data=[app.schemas.clients.ClientRead.model_validate(
-            item, from_attributes=True) for item in items]
+        data=_CLIENT_LIST_ADAPTER.validate_python(items, from_attributes=True),
+        next_cursor=encode_cursor(
+            items[-1].created_at, items[-1].id) if has_more and items else None
     )
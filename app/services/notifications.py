@@ -1,8 +1,25 @@
-import resend
+import logging
 import os
+import httpx
 
+RESEND_API_URL = "https://api.resend.com"
 
-def send_notification_email(
+logger = logging.getLogger(__name__)
+
+# Shared client so connections to Resend are reused across emails. Created on
+# first use and again after close_http_client, so a later lifespan in the same
+# process (a second TestClient, a reloader restart) gets a working client.
+_http_client: httpx.AsyncClient | None = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(base_url=RESEND_API_URL, timeout=10.0)
+    return _http_client
+
+
+async def send_notification_email(
     email: str,
     subject: str,
     html: str
@@ -16,14 +33,38 @@ def send_notification_email(
     Returns:
         dict: Response from the Resend API containing email details.
     Raises:
-        RuntimeError: If the Resend API key is not configured.
+        httpx.HTTPError: If the request fails or Resend rejects it.
+    """
+    response = await _get_http_client().post(
+        "/emails",
+        headers={"Authorization": f"Bearer {os.getenv('RESEND_API_KEY')}"},
+        json={
+            'from': os.getenv("RESEND_FROM_EMAIL"),
+            'to': [email],
+            'subject': subject,
+            'html': html,
+        },
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+async def send_notification_email_in_background(email: str, subject: str, html: str):
+    """
+    Send an email from a background task, logging failures instead of raising
+    since the response has already been returned to the client.
+    """
+    try:
+        await send_notification_email(email=email, subject=subject, html=html)
+    except httpx.HTTPError:
+        logger.exception("Failed to send notification email to %s", email)
+
+
+async def close_http_client():
+    """
+    Close the shared Resend HTTP client. Called on application shutdown.
     """
-    params: resend.Emails.SendParams = {
-        'from': os.getenv("RESEND_FROM_EMAIL"),
-        'to': [email],
-        'subject': subject,
-        'html': html,
-    }
-    email = resend.Emails.send(params)
-
-    return email
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
@@ -6,6 +6,12 @@ import app.schemas
 import app.schemas.common
 import app.schemas.services
 from sqlalchemy import func
+from typing import Optional
+from app.schemas.services import PaginatedServices
+from pydantic import TypeAdapter
+from app.utils import dialect_insert, encode_cursor, decode_cursor
+
+_SERVICE_LIST_ADAPTER = TypeAdapter(list[app.schemas.services.ServiceRead])
 
 
 async def create_service(db: AsyncSession, service: app.schemas.ServiceCreate):
@@ -20,49 +26,79 @@ async def create_service(db: AsyncSession, service: app.schemas.ServiceCreate):
     - **Returns:**
         - The created Service model instance
     """
-    result = await db.execute(select(app.models.Service).filter_by(name=service.name))
-    if result.scalar_one_or_none():
+    stmt = (
+        dialect_insert(db, app.models.Service)
+        .values(**service.model_dump())
+        .on_conflict_do_nothing(index_elements=["name"])
+        .returning(app.models.Service)
+    )
+    db_service = (await db.execute(stmt)).scalar_one_or_none()
+    if db_service is None:
         raise HTTPException(
             status_code=400, detail="Service with this name already exists")
-    db_service = app.models.Service(**service.dict())
-    db.add(db_service)
     await db.commit()
-    await db.refresh(db_service)
     return db_service
 
 
-async def get_services(db: AsyncSession, skip: int = 0, limit: int = 100, search: str = None) -> app.schemas.common.PaginationResponse[app.schemas.services.ServiceRead]:
+async def get_services(db: AsyncSession, skip: int = 0, limit: int = 100, search: str = None, cursor: Optional[str] = None) -> PaginatedServices:
     """
     Retrieve a paginated list of services, optionally filtered by name.
 
+    Services are ordered by id. When a cursor is given, keyset pagination is
+    used and no total count is computed.
+
     - **Parameters:**
         - db: AsyncSession database session
         - skip: Number of items to skip (pagination)
-        - limit: Maximum number of items to return
+        - limit: Maximum number of items to return (capped at 100)
         - search: Filter by service name (optional)
+        - cursor: Opaque cursor returned as next_cursor by a previous page (optional)
     - **Returns:**
         - PaginationResponse[ServiceRead] with service data and pagination info
     """
-    query = select(app.models.Service)
+    limit = min(limit, 100)
+    query = select(app.models.Service).order_by(app.models.Service.id)
     if search:
         query = query.where(app.models.Service.name.ilike(f"%{search}%"))
 
-    total_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(total_query)
+    if cursor:
+        _, last_id = decode_cursor(cursor)
+        result = await db.execute(
+            query.where(app.models.Service.id > last_id).limit(limit + 1))
+        items = result.scalars().all()
+        has_more = len(items) > limit
+        items = items[:limit]
+        return PaginatedServices(
+            data=_SERVICE_LIST_ADAPTER.validate_python(items, from_attributes=True),
+            next_cursor=encode_cursor(
+                None, items[-1].id) if has_more and items else None
+        )
 
-    paginated_query = query.offset(skip).limit(limit)
-    result = await db.execute(paginated_query)
-    items = result.scalars().all()
+    result = await db.execute(
+        query.add_columns(func.count().over().label("total"))
+        .offset(skip).limit(limit)
+    )
+    rows = result.all()
+    items = [row[0] for row in rows]
+    if rows:
+        total = rows[0].total
+    elif skip:
+        total = await db.scalar(
+            query.with_only_columns(func.count(app.models.Service.id)).order_by(None))
+    else:
+        total = 0
 
     page = (skip // limit) + 1 if limit else 1
     total_pages = (total + limit - 1) // limit if limit else 1
-    return app.schemas.common.PaginationResponse[app.schemas.services.ServiceRead](
+    has_more = skip + len(items) < total
+    return PaginatedServices(
         info=app.schemas.common.PaginationInfo(
             page=page,
             per_page=limit,
             total=total,
             total_pages=total_pages
         ),
-        data=[app.schemas.services.ServiceRead.model_validate(
-            item, from_attributes=True) for item in items]
+        data=_SERVICE_LIST_ADAPTER.validate_python(items, from_attributes=True),
+        next_cursor=encode_cursor(
+            None, items[-1].id) if has_more and items else None
     )
@@ -1,56 +1,140 @@
+from typing import NamedTuple, Optional
+from cachetools import TTLCache
+from fastapi import BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import bindparam, exists, lambda_stmt, update
 from sqlalchemy.future import select
 from fastapi import HTTPException
 import app.models
 import app.schemas
 import app.schemas.users
-from app.security import get_password_hash, verify_password
+from app.database import async_sessionmaker
+from app.security import DUMMY_PASSWORD_HASH, aget_password_hash, averify_password, needs_rehash
+from app.utils import dialect_insert
 from app.models.client import Client
 
 
-async def get_user_by_email(db: AsyncSession, email: str):
+class UserCredentials(NamedTuple):
+    """
+    Lightweight snapshot of the user columns needed to log in. Kept instead of
+    the ORM object so cached entries are not tied to a session.
+    """
+    id: int
+    email: str
+    hashed_password: str
+    full_name: Optional[str]
+    role: str
+    is_active: bool
+
+
+_user_by_email_stmt = lambda_stmt(
+    lambda: select(
+        app.models.User.id,
+        app.models.User.email,
+        app.models.User.hashed_password,
+        app.models.User.full_name,
+        app.models.User.role,
+        app.models.User.is_active,
+    ).where(app.models.User.email == bindparam("email"))
+)
+_email_registered_stmt = lambda_stmt(
+    lambda: select(exists().where(app.models.User.email == bindparam("email")))
+)
+_client_id_by_user_id_stmt = lambda_stmt(
+    lambda: select(Client.id).where(Client.user_id == bindparam("user_id"))
+)
+
+# UserCredentials keyed by email; entries are dropped when the password changes
+_user_cache = TTLCache(maxsize=2048, ttl=30)
+
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[UserCredentials]:
     """
     Retrieve a user by their email address.
 
+    Lookups are cached for 30 seconds. Callers that need to modify the user
+    should load the User by id in their own session.
+
     - **Parameters:**
         - db: AsyncSession database session
         - email: User's email address
     - **Returns:**
-        - User model instance if found, otherwise None
+        - UserCredentials if found, otherwise None
     """
-    result = await db.execute(select(app.models.User).filter(app.models.User.email == email))
-    return result.scalar_one_or_none()
+    user = _user_cache.get(email)
+    if user is not None:
+        return user
+    result = await db.execute(_user_by_email_stmt, {"email": email})
+    row = result.one_or_none()
+    if row is None:
+        return None
+    user = UserCredentials(*row)
+    _user_cache[email] = user
+    return user
 
 
-async def create_user(db: AsyncSession, user: app.schemas.UserCreate):
+async def create_user(db: AsyncSession, user: app.schemas.UserCreate, commit: bool = True):
     """
     Create a new user with a hashed password.
 
     - **Parameters:**
         - db: AsyncSession database session
         - user: UserCreate object with user details
+        - commit: Commit the transaction; when False the user is inserted but left uncommitted so the caller can commit it together with other writes
     - **Raises:**
         - 400 if the email is already registered
     - **Returns:**
         - The created User model instance
     """
-    db_user = await get_user_by_email(db, user.email)
-    if db_user:
+    # Cheap check so known emails are rejected without paying for a hash;
+    # ON CONFLICT below still guards against concurrent registrations.
+    if await db.scalar(_email_registered_stmt, {"email": user.email}):
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_password = get_password_hash(user.password)
-    db_user = app.models.User(
-        email=user.email,
-        hashed_password=hashed_password,
-        full_name=user.full_name,
-        role=user.role
+    hashed_password = await aget_password_hash(user.password)
+    stmt = (
+        dialect_insert(db, app.models.User)
+        .values(
+            email=user.email,
+            hashed_password=hashed_password,
+            full_name=user.full_name,
+            role=user.role
+        )
+        .on_conflict_do_nothing(index_elements=["email"])
+        .returning(app.models.User)
     )
-    db.add(db_user)
-    await db.commit()
-    await db.refresh(db_user)
+    db_user = (await db.execute(stmt)).scalar_one_or_none()
+    if db_user is None:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    _user_cache.pop(db_user.email, None)
+    if commit:
+        await db.commit()
     return db_user
 
 
-async def authenticate_user(db: AsyncSession, email: str, password: str):
+async def rehash_user_password(user_id: int, password: str):
+    """
+    Store a new hash of the password with the current settings.
+    Uses its own session so it can run after the response has been sent.
+
+    - **Parameters:**
+        - user_id: ID of the user to update
+        - password: Plain text password that was just verified
+    """
+    hashed_password = await aget_password_hash(password)
+    async with async_sessionmaker() as db:
+        result = await db.execute(
+            update(app.models.User)
+            .where(app.models.User.id == user_id)
+            .values(hashed_password=hashed_password)
+            .returning(app.models.User.email)
+        )
+        email = result.scalar_one_or_none()
+        await db.commit()
+    if email is not None:
+        _user_cache.pop(email, None)
+
+
+async def authenticate_user(db: AsyncSession, email: str, password: str, background_tasks: BackgroundTasks | None = None):
     """
     Authenticate a user by email and password.
 
@@ -58,14 +142,26 @@ async def authenticate_user(db: AsyncSession, email: str, password: str):
         - db: AsyncSession database session
         - email: User's email address
         - password: Plain text password
+        - background_tasks: When given, outdated hashes are upgraded after the response instead of inline
     - **Raises:**
         - 401 if credentials are invalid
     - **Returns:**
-        - User model instance if authentication is successful
+        - UserCredentials of the user if authentication is successful
+
+    Hashes made with a deprecated scheme (bcrypt) or outdated cost parameters
+    are upgraded to the current settings on a successful login. Unknown emails
+    are checked against a dummy hash so they fail in the same time as a wrong
+    password.
     """
     user = await get_user_by_email(db, email)
-    if not user or not verify_password(password, user.hashed_password):
+    hashed_password = user.hashed_password if user else DUMMY_PASSWORD_HASH
+    if not await averify_password(password, hashed_password) or not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if needs_rehash(user.hashed_password):
+        if background_tasks is not None:
+            background_tasks.add_task(rehash_user_password, user.id, password)
+        else:
+            await rehash_user_password(user.id, password)
     return user
 
 
@@ -73,25 +169,29 @@ async def get_client_me(db: AsyncSession, current_user: app.schemas.users.UserRe
     """
     Retrieve the client's profile associated with the current user.
 
+    The client id loaded with the current user is used when present; the
+    database is only queried when the profile may have been created since.
+
     - **Parameters:**
         - db: AsyncSession database session
-        - current_user: Authenticated user model instance
+        - current_user: Authenticated user, usually the CurrentUser snapshot
     - **Returns:**
         - UserClient object with the user's details
     - **Raises:**
         - 404 if the client profile is not found
     """
-    client = await db.execute(
-        select(Client).filter(Client.user_id == current_user.id)
-    )
-    client = client.scalar_one_or_none()
-    if not client:
+    client_id = getattr(current_user, "client_id", None)
+    if client_id is None:
+        result = await db.execute(_client_id_by_user_id_stmt, {"user_id": current_user.id})
+        client_id = result.scalar_one_or_none()
+    if client_id is None:
         raise HTTPException(status_code=404, detail="Client profile not found")
 
-    return app.schemas.users.UserClient(
+    # Every value comes from the database, so validation is skipped
+    return app.schemas.users.UserClient.model_construct(
         email=current_user.email,
         full_name=current_user.full_name,
         role=current_user.role,
         id=current_user.id,
-        client_id=client.id
+        client_id=client_id
     )
@@ -1,19 +1,109 @@
+import base64
 from datetime import datetime, timezone
-from jinja2 import Environment, FileSystemLoader
+from pathlib import Path
+from typing import Optional
+from fastapi import HTTPException, Response
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from pydantic import BaseModel
+from sqlalchemy import DateTime, literal, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 
+EMAIL_TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "assets" / "email_templates"
 
-def make_naive(dt: datetime):
+# Templates are compiled once at import and never re-checked on disk. The
+# bytecode cache (in the system temp dir) skips parsing after a restart.
+_jinja_env = Environment(
+    loader=FileSystemLoader(EMAIL_TEMPLATES_DIR),
+    autoescape=True,
+    auto_reload=False,
+    cache_size=-1,
+    bytecode_cache=FileSystemBytecodeCache(),
+    enable_async=True,
+)
+_appointment_confirmation_template = _jinja_env.get_template(
+    "appointment_confirmation.html")
+
+
+def make_aware(dt: datetime):
+    """
+    Convert a datetime object to a timezone-aware UTC datetime.
+    If the datetime is naive, it is assumed to already be in UTC.
+    If it has timezone info, it will be converted to UTC.
+    """
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def encode_cursor(created_at: datetime | None, id: int) -> str:
+    """
+    Encode the position of the last row of a page as an opaque keyset cursor.
+    """
+    value = f"{created_at.isoformat() if created_at else ''}|{id}"
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime | None, int]:
+    """
+    Decode a cursor produced by encode_cursor into its (created_at, id) pair.
+    Raises a 400 error if the cursor is malformed.
+    """
+    try:
+        created_at, id = base64.urlsafe_b64decode(
+            cursor.encode()).decode().split("|")
+        return (datetime.fromisoformat(created_at) if created_at else None), int(id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def dialect_insert(db: AsyncSession, model):
+    """
+    Build an INSERT for the session's dialect so callers can use
+    on_conflict_do_nothing(); PostgreSQL in production, SQLite in tests.
     """
-    Convert a datetime object to naive (timezone-unaware) UTC datetime.
-    If the datetime is already naive, it will be returned as is.
-    If it has timezone info, it will be converted to UTC and then made naive.
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
+
+
+def keyset_before(created_at_column, id_column, created_at: datetime | None, last_id: int):
     """
-    if dt.tzinfo is not None:
-        return dt.astimezone(timezone.utc).replace(tzinfo=None)
-    return dt
+    Build the WHERE clause selecting rows that sort after a (created_at, id)
+    cursor in newest-first order.
+    Raises a 400 error if the cursor carries no timestamp (e.g. one issued by
+    an id-ordered list), since comparing against NULL would match no rows.
+    """
+    if created_at is None:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return tuple_(created_at_column, id_column) < tuple_(
+        literal(created_at, DateTime(timezone=True)), last_id)
+
 
+DEEP_OFFSET_THRESHOLD = 1000
+
+
+def json_response(model: BaseModel, headers: Optional[dict] = None) -> Response:
+    """
+    Serialize a response model to JSON in a single pydantic-core pass.
+    Returning a Response skips FastAPI's dump + re-validation against
+    response_model, which is costly for large paginated lists.
+    """
+    return Response(content=model.model_dump_json(), media_type="application/json", headers=headers)
 
-def render_appointment_email(name, date, services, link):
-    env = Environment(loader=FileSystemLoader("assets/email_templates"))
-    template = env.get_template("appointment_confirmation.html")
-    return template.render(name=name, date=date, services=services, link=link)
+
+def pagination_headers(skip: int, cursor: Optional[str] = None) -> Optional[dict]:
+    """
+    Flag deep offset pagination as deprecated so clients move to cursors.
+    Returns None when no extra headers are needed.
+    """
+    if not cursor and skip > DEEP_OFFSET_THRESHOLD:
+        return {"Deprecation": "true"}
+    return None
+
+
+async def render_appointment_email(name, date, services, link):
+    """
+    Render the appointment confirmation email. Values are HTML-escaped.
+    """
+    return await _appointment_confirmation_template.render_async(name=name, date=date, services=services, link=link)
@@ -1,40 +1,38 @@
 import asyncio
-from datetime import datetime, timedelta
-from sqlalchemy import delete
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, insert, text
 from app.database import async_sessionmaker
 from app.models.user import User
 from app.models.client import Client
 from app.models.service import Service
 from app.models.appointment import Appointment
-
-import bcrypt
-
-
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+from app.models.appointment_services import appointment_services
+from app.security import get_password_hash
 
 
 async def seed():
     session = async_sessionmaker()
     async with session as db:
-        await db.execute(delete(Appointment))
-        await db.execute(delete(Service))
-        await db.execute(delete(Client))
-        await db.execute(delete(User))
-        await db.commit()
+        if db.get_bind().dialect.name == "postgresql":
+            await db.execute(text(
+                "TRUNCATE appointments, services, clients, users RESTART IDENTITY CASCADE"))
+        else:
+            for model in (Appointment, Service, Client, User):
+                await db.execute(delete(model))
 
-        password = hash_password("admin123")
+        admin_hash, user1_hash, user2_hash = await asyncio.gather(
+            asyncio.to_thread(get_password_hash, "admin123"),
+            asyncio.to_thread(get_password_hash, "user1pass"),
+            asyncio.to_thread(get_password_hash, "user2pass"),
+        )
         admin = User(email="admin@example.com", full_name="Admin User",
-                     hashed_password=password, is_active=True, role="admin")
+                     hashed_password=admin_hash, is_active=True, role="admin")
         user1 = User(email="user1@example.com", full_name="User One",
-                     hashed_password=hash_password("user1pass"), is_active=True, role="client")
+                     hashed_password=user1_hash, is_active=True, role="client")
         user2 = User(email="user2@example.com", full_name="User Two",
-                     hashed_password=hash_password("user2pass"), is_active=True, role="staff")
+                     hashed_password=user2_hash, is_active=True, role="staff")
         db.add_all([admin, user1, user2])
-        await db.commit()
-        await db.refresh(admin)
-        await db.refresh(user1)
-        await db.refresh(user2)
+        await db.flush()
 
         client1 = Client(
             name="María Gómez",
@@ -51,9 +49,7 @@ async def seed():
             user_id=user2.id
         )
         db.add_all([client1, client2])
-        await db.commit()
-        await db.refresh(client1)
-        await db.refresh(client2)
+        await db.flush()
 
         service1 = Service(name="Manicura tradicional", duration=45,
                            price=20.0, description="Manicura básica con esmalte tradicional")
@@ -62,31 +58,50 @@ async def seed():
         service3 = Service(name="Decoración de uñas", duration=30,
                            price=10.0, description="Decoración artística personalizada")
         db.add_all([service1, service2, service3])
-        await db.commit()
-        await db.refresh(service1)
-        await db.refresh(service2)
-        await db.refresh(service3)
+        await db.flush()
 
-        appointment1 = Appointment(
-            client_id=client1.id,
-            date=datetime.utcnow() + timedelta(days=1, hours=10),
-            status="pending",
-            created_at=datetime.utcnow(),
-            notes="Prefiere colores neutros.",
-            services=[service1, service3],
+        now = datetime.now(timezone.utc)
+        date1 = now + timedelta(days=1, hours=10)
+        date2 = now + timedelta(days=2, hours=11)
+        appointment_services_by_row = [[service1, service3], [service2]]
+        result = await db.execute(
+            insert(Appointment).returning(Appointment.id, sort_by_parameter_order=True),
+            [
+                {
+                    "client_id": client1.id,
+                    "date": date1,
+                    "end_time": date1 + timedelta(minutes=service1.duration + service3.duration),
+                    "total_duration": service1.duration + service3.duration,
+                    "status": "pending",
+                    "notes": "Prefiere colores neutros.",
+                },
+                {
+                    "client_id": client2.id,
+                    "date": date2,
+                    "end_time": date2 + timedelta(minutes=service2.duration),
+                    "total_duration": service2.duration,
+                    "status": "confirmed",
+                    "notes": "Traer catálogo de diseños.",
+                },
+            ],
         )
-        appointment2 = Appointment(
-            client_id=client2.id,
-            date=datetime.utcnow() + timedelta(days=2, hours=11),
-            status="confirmed",
-            created_at=datetime.utcnow(),
-            notes="Traer catálogo de diseños.",
-            services=[service2],
+        await db.execute(
+            insert(appointment_services),
+            [
+                {"appointment_id": appointment_id, "service_id": service.id}
+                for appointment_id, services in zip(result.scalars(), appointment_services_by_row)
+                for service in services
+            ],
         )
-        db.add_all([appointment1, appointment2])
         await db.commit()
 
         print("✅ Seed completado con datos de ejemplo.")
 
 if __name__ == "__main__":
-    asyncio.run(seed())
+    # uvloop comes with uvicorn[standard]; fall back to asyncio where it is missing (Windows)
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(seed())
+    else:
+        uvloop.run(seed())
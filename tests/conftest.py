@@ -0,0 +1,11 @@
+import os
+import sys
+from pathlib import Path
+
+# Make the app package importable when pytest is started from tests/.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# app.database and app.security read these at import time; the tests build
+# their own in-memory engine, so any SQLite URL and secret will do.
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-at-least-32-bytes")
@@ -1,20 +1,28 @@
-import subprocess
 import sys
 import argparse
 from pathlib import Path
 
 
 def run_command(cmd, description):
-    """Ejecuta un comando y muestra el resultado"""
+    """
+    Ejecuta un comando de pytest y muestra el resultado.
+    Los tests se ejecutan con pytest.main en este mismo proceso.
+    """
     print(f"\n{'='*60}")
     print(f"🚀 {description}")
     print(f"{'='*60}")
     print(f"Ejecutando: {' '.join(cmd)}")
     print()
 
-    result = subprocess.run(cmd, capture_output=False)
+    try:
+        import pytest
+    except ImportError:
+        print("❌ pytest no está instalado. Ejecuta: pip install -r requirements-test.txt")
+        sys.exit(1)
+
+    returncode = pytest.main(cmd[1:])
 
-    if result.returncode == 0:
+    if returncode == 0:
         print(f"✅ {description} - EXITOSO")
     else:
         print(f"❌ {description} - FALLÓ")
@@ -48,13 +56,6 @@ def main():
 
     args = parser.parse_args()
 
-    try:
-        subprocess.run(["pytest", "--version"],
-                       capture_output=True, check=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print("❌ pytest no está instalado. Ejecuta: pip install -r requirements-test.txt")
-        sys.exit(1)
-
     success = True
 
     if args.mode == "quick":
@@ -1,41 +1,35 @@
 import pytest
 import pytest_asyncio
-from sqlalchemy import create_engine
+from sqlalchemy import DateTime, create_engine, event
+from sqlalchemy.dialects.sqlite import DATETIME as SQLITE_DATETIME
 from app.models.user import User
 from app.models.client import Client
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import StaticPool
 from fastapi import HTTPException
-import sys
-from unittest.mock import MagicMock
 from app.schemas.clients import ClientCreate, ClientRead
 from app.schemas.common import PaginationResponse, PaginationInfo
 import asyncio
+import app.models  # noqa: F401  registers every table on Base.metadata
+from app.database import Base
 from app.services.clients import create_client, get_clients
+from app.utils import encode_cursor
 
-Base = declarative_base()
-
-app_models = MagicMock()
-app_models.Client = Client
-app_models.Base = Base
-
-app_schemas = MagicMock()
-app_schemas.ClientCreate = ClientCreate
-
-app_schemas_clients = MagicMock()
-app_schemas_clients.ClientRead = ClientRead
+TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
-app_schemas_common = MagicMock()
-app_schemas_common.PaginationResponse = PaginationResponse
-app_schemas_common.PaginationInfo = PaginationInfo
 
-sys.modules['app.models'] = app_models
-sys.modules['app.schemas'] = app_schemas
-sys.modules['app.schemas.clients'] = app_schemas_clients
-sys.modules['app.schemas.common'] = app_schemas_common
+class _SecondsDateTime(SQLITE_DATETIME):
+    """
+    SQLite stores server_default=func.now() as 'YYYY-MM-DD HH:MM:SS' text;
+    bind datetimes in the same format so keyset cursors compare equal to the
+    rows they were taken from.
+    """
 
-TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault(
+            "storage_format",
+            "%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d")
+        super().__init__(*args, **kwargs)
 
 
 @pytest.fixture(scope="session")
@@ -45,7 +39,7 @@ def event_loop():
     loop.close()
 
 
-@pytest_asyncio.fixture(scope="function")
+@pytest_asyncio.fixture(scope="session")
 async def async_engine():
     engine = create_async_engine(
         TEST_DATABASE_URL,
@@ -54,6 +48,18 @@ async def async_engine():
         poolclass=StaticPool,
         connect_args={"check_same_thread": False}
     )
+    dialect = engine.sync_engine.dialect
+    dialect.colspecs = {**dialect.colspecs, DateTime: _SecondsDateTime}
+
+    # Let SQLAlchemy emit BEGIN itself so SAVEPOINTs nest inside the
+    # per-test transaction (pysqlite would otherwise commit them).
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _emit_begin(connection):
+        connection.exec_driver_sql("BEGIN")
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
@@ -63,19 +69,61 @@ async def async_engine():
     await engine.dispose()
 
 
+@pytest_asyncio.fixture
+async def db_session(async_engine):
+    """
+    Session bound to a connection whose outer transaction is rolled back
+    after each test; commits inside the test only release a savepoint.
+    """
+    async with async_engine.connect() as connection:
+        await connection.begin()
+        session_factory = async_sessionmaker(
+            bind=connection,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+        async with session_factory() as session:
+            yield session
+        await connection.rollback()
+
+
+def _make_user(email, **kwargs):
+    return User(email=email, hashed_password="not-a-real-hash", **kwargs)
+
+
 @pytest_asyncio.fixture
 async def sample_user(db_session):
-    user = User(
-        id=1,
-        email="testuser@example.com",
-        name="Test User",
-    )
+    user = _make_user("testuser@example.com", id=1, full_name="Test User")
     db_session.add(user)
     await db_session.commit()
     await db_session.refresh(user)
     return user
 
 
+@pytest_asyncio.fixture
+async def other_user(db_session, sample_user):
+    user = _make_user("otheruser@example.com", full_name="Other User")
+    db_session.add(user)
+    await db_session.commit()
+    return user
+
+
+async def _bulk_create_clients(db, items):
+    """
+    Insert fixture clients, each with its own user (clients.user_id is
+    unique), in a single commit. Tests of create_client itself keep calling
+    the service so its duplicate checks are still exercised.
+    """
+    users = [_make_user(f"owner-{item.email}") for item in items]
+    db.add_all(users)
+    await db.flush()
+    clients = [Client(**item.model_dump(), user_id=user.id)
+               for item, user in zip(items, users)]
+    db.add_all(clients)
+    await db.commit()
+    return clients
+
+
 @pytest.fixture
 def client_create_data():
     return ClientCreate(
@@ -100,7 +148,7 @@ class TestCreateClient:
 
     @pytest.mark.asyncio
     async def test_create_client_success(self, db_session, client_create_data, sample_user):
-        result = await create_client(db_session, client_create_data, sample_user.user.id)
+        result = await create_client(db_session, client_create_data, sample_user.id)
 
         assert result is not None
         assert result.id is not None
@@ -108,13 +156,13 @@ class TestCreateClient:
         assert result.email == client_create_data.email
         assert result.phone == client_create_data.phone
         assert result.address == client_create_data.address
-        assert result.user_id == sample_user.user.id
+        assert result.user_id == sample_user.id
 
         assert result.id > 0
 
     @pytest.mark.asyncio
-    async def test_create_client_duplicate_email(self, db_session, client_create_data, sample_uuser):
-        await create_client(db_session, client_create_data, sample_user.user.id)
+    async def test_create_client_duplicate_email(self, db_session, client_create_data, sample_user, other_user):
+        await create_client(db_session, client_create_data, sample_user.id)
 
         duplicate_client = ClientCreate(
             name="Otro Cliente",
@@ -124,7 +172,7 @@ class TestCreateClient:
         )
 
         with pytest.raises(HTTPException) as exc_info:
-            await create_client(db_session, duplicate_client, sample_user.user.id)
+            await create_client(db_session, duplicate_client, other_user.id)
         assert exc_info.value.status_code == 400
         assert "Client with this email already exists" in exc_info.value.detail
 
@@ -134,14 +182,16 @@ class TestCreateClient:
         db_session,
         client_create_data,
         another_client_create_data,
-        sample_user
+        sample_user,
+        other_user
     ):
-        client1 = await create_client(db_session, client_create_data, sample_user.user.id)
-        client2 = await create_client(db_session, another_client_create_data, sample_user.user.id)
+        client1 = await create_client(db_session, client_create_data, sample_user.id)
+        client2 = await create_client(db_session, another_client_create_data, other_user.id)
 
-        assert client1.id is not client2.id
+        assert client1.id != client2.id
         assert client1.email != client2.email
-        assert client1.user_id == client2.user_id == sample_user.user.id
+        assert client1.user_id == sample_user.id
+        assert client2.user_id == other_user.id
 
     @pytest.mark.asyncio
     async def test_create_client_with_minimal_data(self, db_session, sample_user):
@@ -150,7 +200,7 @@ class TestCreateClient:
             email="minimal@example.com"
         )
 
-        result = await create_client(db_session, minimal_client, sample_user.user.id)
+        result = await create_client(db_session, minimal_client, sample_user.id)
 
         assert result is not None
         assert result.name == minimal_client.name
@@ -160,8 +210,8 @@ class TestCreateClient:
 
     @pytest.mark.asyncio
     async def test_create_client_different_users_same_email(self, db_session):
-        user1 = User(id=1, email="user1@example.com", name="User 1")
-        user2 = User(id=2, email="user2@example.com", name="User 2")
+        user1 = _make_user("user1@example.com", id=1, full_name="User 1")
+        user2 = _make_user("user2@example.com", id=2, full_name="User 2")
 
         db_session.add(user1)
         db_session.add(user2)
@@ -217,12 +267,7 @@ class TestGetClients:
             ),
         ]
 
-        created_clients = []
-        for client_data in clients_data:
-            client = await create_client(db_session, client_data, sample_user.id)
-            created_clients.append(client)
-
-        return created_clients
+        return await _bulk_create_clients(db_session, clients_data)
 
     @pytest.mark.asyncio
     async def test_get_clients_default_pagination(self, db_session, setup_test_clients):
@@ -276,7 +321,7 @@ class TestGetClients:
         result = await get_clients(db_session, search="nonexistent")
 
         assert result.info.total == 0
-        assert result.info.total_pages == 1
+        assert result.info.total_pages == 0
         assert len(result.data) == 0
 
     @pytest.mark.asyncio
@@ -284,7 +329,7 @@ class TestGetClients:
         result = await get_clients(db_session)
 
         assert result.info.total == 0
-        assert result.info.total_pages == 1
+        assert result.info.total_pages == 0
         assert len(result.data) == 0
 
     @pytest.mark.asyncio
@@ -311,10 +356,46 @@ class TestGetClients:
         for client in result.data:
             assert "@example.com" in client.email
 
+    @pytest.mark.asyncio
+    async def test_get_clients_cursor_pagination(self, db_session, setup_test_clients):
+        first_page = await get_clients(db_session, limit=2)
+        assert len(first_page.data) == 2
+        assert first_page.next_cursor is not None
+
+        seen = [client.id for client in first_page.data]
+        cursor = first_page.next_cursor
+        # 5 clients at 2 per page: the cursor must run out after 2 more pages
+        for _ in range(3):
+            if not cursor:
+                break
+            page = await get_clients(db_session, limit=2, cursor=cursor)
+            assert page.info is None
+            seen.extend(client.id for client in page.data)
+            cursor = page.next_cursor
+        assert cursor is None
+
+        expected_ids = sorted((client.id for client in setup_test_clients), reverse=True)
+        assert seen == expected_ids
+
+    @pytest.mark.asyncio
+    async def test_get_clients_invalid_cursor(self, db_session, setup_test_clients):
+        with pytest.raises(HTTPException) as exc_info:
+            await get_clients(db_session, cursor="not-a-cursor")
+
+        assert exc_info.value.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_get_clients_cursor_without_timestamp(self, db_session, setup_test_clients):
+        # Services issue id-only cursors; they must not silently match nothing here
+        with pytest.raises(HTTPException) as exc_info:
+            await get_clients(db_session, cursor=encode_cursor(None, setup_test_clients[0].id))
+
+        assert exc_info.value.status_code == 400
+
 
 class TestIntegrationScenarios:
     @pytest.mark.asyncio
-    async def test_complete_client_management_workflow(self, db_session, sample_user):
+    async def test_complete_client_management_workflow(self, db_session):
         empty_result = await get_clients(db_session)
         assert empty_result.info.total == 0
 
@@ -324,9 +405,13 @@ class TestIntegrationScenarios:
             ClientCreate(name="Cliente C", email="c@test.com", phone="333"),
         ]
 
+        owners = [_make_user(f"owner-{data.email}") for data in clients_to_create]
+        db_session.add_all(owners)
+        await db_session.commit()
+
         created_clients = []
-        for client_data in clients_to_create:
-            client = await create_client(db_session, client_data, sample_user.id)
+        for client_data, owner in zip(clients_to_create, owners):
+            client = await create_client(db_session, client_data, owner.id)
             created_clients.append(client)
 
         all_clients = await get_clients(db_session)
@@ -341,7 +426,7 @@ class TestIntegrationScenarios:
         assert len(paginated_result.data) == 1
 
     @pytest.mark.asyncio
-    async def test_duplicate_email_prevention(self, db_session, sample_user):
+    async def test_duplicate_email_prevention(self, db_session, sample_user, other_user):
         client1_data = ClientCreate(
             name="First Client",
             email="unique@test.com",
@@ -358,7 +443,7 @@ class TestIntegrationScenarios:
         )
 
         with pytest.raises(HTTPException) as exc_info:
-            await create_client(db_session, client2_data, sample_user.id)
+            await create_client(db_session, client2_data, other_user.id)
 
         assert exc_info.value.status_code == 400
 
@@ -367,13 +452,15 @@ class TestIntegrationScenarios:
 
     @pytest.mark.asyncio
     async def test_large_dataset_pagination(self, db_session, sample_user):
-        for i in range(25):
-            client_data = ClientCreate(
+        clients_data = [
+            ClientCreate(
                 name=f"Cliente {i:02d}",
                 email=f"client{i:02d}@test.com",
                 phone=f"{i:03d}000000"
             )
-            await create_client(db_session, client_data, sample_user.id)
+            for i in range(25)
+        ]
+        await _bulk_create_clients(db_session, clients_data)
 
         page1 = await get_clients(db_session, skip=0, limit=10)
         assert len(page1.data) == 10
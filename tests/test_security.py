@@ -0,0 +1,43 @@
+import time
+from datetime import timedelta
+
+import jwt
+import pytest
+
+from app.dependencies import _decode_token
+from app.security import SECRET_KEY, _encode_hs256, create_access_token
+
+
+class TestCreateAccessToken:
+
+    def test_token_round_trips_through_pyjwt(self):
+        before = int(time.time())
+        token = create_access_token(
+            {"sub": "user@example.com", "role": "admin"}, expires_delta=timedelta(minutes=5))
+
+        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+
+        assert payload["sub"] == "user@example.com"
+        assert payload["role"] == "admin"
+        assert isinstance(payload["exp"], int)
+        assert before + 300 <= payload["exp"] <= int(time.time()) + 300
+
+    def test_hand_signed_token_matches_pyjwt(self):
+        payload = {"sub": "user@example.com", "role": "client", "exp": 1_900_000_000}
+
+        assert _encode_hs256(payload) == jwt.encode(payload, SECRET_KEY, algorithm="HS256")
+
+    def test_decode_token_returns_claims(self):
+        token = create_access_token({"sub": "user@example.com", "role": "client"})
+
+        token_data = _decode_token(token)
+
+        assert token_data.email == "user@example.com"
+        assert token_data.role == "client"
+
+    def test_expired_token_is_rejected(self):
+        token = create_access_token(
+            {"sub": "user@example.com", "role": "client"}, expires_delta=timedelta(seconds=-10))
+
+        with pytest.raises(jwt.ExpiredSignatureError):
+            _decode_token(token)